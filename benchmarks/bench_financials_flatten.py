@@ -0,0 +1,90 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Make the repository root and src importable when run as a script
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path[:0] = [ROOT_DIR, os.path.join(ROOT_DIR, 'src')]
+
+from financials import flatten_financials, LINE_ITEMS
+
+# Statement section of each line item, as laid out in Polygon filings
+SECTIONS = {
+    'income_statement': LINE_ITEMS[:7],
+    'balance_sheet': LINE_ITEMS[7:14],
+    'cash_flow_statement': LINE_ITEMS[14:],
+}
+
+# The per-filing dict loop previously used by create_financials_dataframe, kept here as the baseline
+def flatten_with_loop(data):
+    records = []
+    for item in data:
+        record = {
+            "CIK": item.get("cik"),
+            "Company Name": item.get("company_name"),
+            "Fiscal Year": item.get("fiscal_year"),
+            "Fiscal Period": item.get("fiscal_period"),
+            "Start Date": item.get("start_date"),
+            "End Date": item.get("end_date"),
+            "Filing Date": item.get("filing_date"),
+        }
+        for section_data in item.get('financials', {}).values():
+            for value in section_data.values():
+                label = value.get("label")
+                if label:
+                    record[label] = value.get("value")
+        record["Free Cash Flow"] = record.get("Net Cash Flow From Operating Activities", 0) + record.get("Net Cash Flow From Investing Activities", 0)
+        records.append(record)
+
+    df = pd.DataFrame(records)
+    columns_order = ["CIK", "Company Name", "Fiscal Year", "Fiscal Period", "Start Date", "End Date", "Filing Date", *LINE_ITEMS, "Free Cash Flow"]
+    return df[[col for col in columns_order if col in df.columns]]
+
+# Synthetic filings shaped like the results of /vX/reference/financials, with a few extra unused line items
+def make_filings(count):
+    rng = np.random.default_rng(0)
+    filings = []
+    for i in range(count):
+        financials = {}
+        for section, labels in SECTIONS.items():
+            items = {label.lower().replace(' ', '_'): {'label': label, 'value': float(rng.integers(-10**9, 10**10)), 'unit': 'USD'} for label in labels}
+            items['other_item'] = {'label': f'Other {section}', 'value': 1.0, 'unit': 'USD'}
+            financials[section] = items
+        filings.append({
+            'cik': f'{i:010d}', 'company_name': 'Example Corp', 'fiscal_year': str(2000 + i % 25), 'fiscal_period': 'Q1',
+            'start_date': '2024-01-01', 'end_date': '2024-03-31', 'filing_date': '2024-04-30', 'financials': financials,
+        })
+    return filings
+
+# Time a function call in milliseconds, keeping the best of several runs
+def timed(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return result, best
+
+# Compare the nested-loop flattening with the columnar one
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark flattening of financials filings into a dataframe.')
+    parser.add_argument('--filings', type=int, default=10_000, help='Number of synthetic filings')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per implementation; the best is reported')
+    args = parser.parse_args()
+
+    filings = make_filings(args.filings)
+    old, old_ms = timed(lambda: flatten_with_loop(filings), args.repeat)
+    new, new_ms = timed(lambda: flatten_financials(filings), args.repeat)
+    pd.testing.assert_frame_equal(old, new, check_dtype=False)
+
+    print(f"{args.filings:,} filings, {new.shape[1]} columns")
+    print(f"{'nested loop (ms)':24}{old_ms:12,.1f}")
+    print(f"{'columnar (ms)':24}{new_ms:12,.1f}")
+    print(f"{'speedup':24}{old_ms / new_ms:12,.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+import requests
+
+# Make the repository root and src importable when run as a script
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path[:0] = [ROOT_DIR, os.path.join(ROOT_DIR, 'src')]
+
+import http_client
+from config.api_config import CONNECT_TIMEOUT, READ_TIMEOUT
+
+# Time a number of sequential GET requests made by the given function
+def time_requests(get, url, count):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        get(url).content
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+# GET through the shared pooled session, bypassing the rate limiter so only connection reuse is measured
+def pooled_get(url):
+    return http_client.get_session().get(url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+
+# GET with a new connection per call, with the same timeouts
+def bare_get(url):
+    return requests.get(url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+
+# Compare bare requests.get (new connection per call) with the shared pooled session
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-request latency of bare requests.get against the pooled session.')
+    parser.add_argument('--url', default='https://api.polygon.io/v1/marketstatus/now', help='URL to request (the status code does not matter)')
+    parser.add_argument('--requests', type=int, default=20, help='Number of requests per client')
+    args = parser.parse_args()
+
+    # Warm up the pooled session so both runs measure steady-state requests
+    pooled_get(args.url).content
+
+    bare = time_requests(bare_get, args.url, args.requests)
+    pooled = time_requests(pooled_get, args.url, args.requests)
+
+    print(f"URL: {args.url} ({args.requests} requests each)")
+    print(f"bare requests.get : mean {statistics.mean(bare):8.1f} ms, median {statistics.median(bare):8.1f} ms")
+    print(f"pooled session    : mean {statistics.mean(pooled):8.1f} ms, median {statistics.median(pooled):8.1f} ms")
+    print(f"saved per request : {statistics.mean(bare) - statistics.mean(pooled):8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
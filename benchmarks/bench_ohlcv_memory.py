@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Make the repository root and src importable when run as a script
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path[:0] = [ROOT_DIR, os.path.join(ROOT_DIR, 'src')]
+
+from ohlcv import OHLCVBars
+from config.cache_config import MARKET_TIMEZONE
+
+# Synthetic minute bars shaped like the results of /v2/aggs, as a list of dicts
+def make_results(count):
+    rng = np.random.default_rng(0)
+    t = 1_704_067_200_000 + np.arange(count, dtype='int64') * 60_000
+    prices = rng.uniform(10, 500, count).round(4)
+    volumes = rng.integers(1, 1_000_000, count)
+    trades = rng.integers(1, 10_000, count)
+    return [
+        {'v': int(v), 'vw': p + 0.01, 'o': p, 'c': p + 0.02, 'h': p + 0.05, 'l': p - 0.05, 't': int(ts), 'n': int(n)}
+        for ts, p, v, n in zip(t.tolist(), prices.tolist(), volumes.tolist(), trades.tolist())
+    ]
+
+# The DataFrame built today: raw bars from the JSON results, then the Open/High/Low/Close/Volume frame on a market-time index
+def build_dataframes(results):
+    raw = pd.DataFrame(results)
+    dates = pd.to_datetime(raw['t'].to_numpy(), unit='ms', utc=True).tz_convert(MARKET_TIMEZONE).rename('Date')
+    frame = raw.rename(columns={'o': 'Open', 'h': 'High', 'l': 'Low', 'c': 'Close', 'v': 'Volume'}).set_axis(dates)
+    return raw, frame[['Open', 'High', 'Low', 'Close', 'Volume']]
+
+# Time a function call in milliseconds, keeping the best of several runs
+def timed(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return result, best
+
+# Compare the memory held by the DataFrames with OHLCVBars, scaled to one million bars
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark memory per million bars of DataFrames and OHLCVBars.')
+    parser.add_argument('--bars', type=int, default=1_000_000, help='Number of synthetic bars')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per conversion; the best is reported')
+    args = parser.parse_args()
+
+    results = make_results(args.bars)
+    (raw, frame), frames_ms = timed(lambda: build_dataframes(results), args.repeat)
+    bars64, bars64_ms = timed(lambda: OHLCVBars.from_records(results), args.repeat)
+    bars32, bars32_ms = timed(lambda: OHLCVBars.from_records(results, np.float32), args.repeat)
+    view, view_ms = timed(bars64.to_pandas, args.repeat)
+    assert np.array_equal(view['Close'].to_numpy(), frame['Close'].to_numpy())
+    assert np.shares_memory(view['Close'].to_numpy(), bars64.c)
+
+    scale = 1_000_000 / args.bars
+    rows = [
+        ('raw DataFrame', raw.memory_usage(index=True, deep=True).sum(), frames_ms),
+        ('OHLCV DataFrame', frame.memory_usage(index=True, deep=True).sum(), None),
+        ('OHLCVBars float64', bars64.nbytes, bars64_ms),
+        ('OHLCVBars float32', bars32.nbytes, bars32_ms),
+        ('to_pandas() (extra)', view.index.nbytes, view_ms),
+    ]
+    print(f"{args.bars:,} bars, figures per million bars")
+    print(f"{'':24}{'MB':>10}{'build (ms)':>14}")
+    for name, size, ms in rows:
+        print(f"{name:24}{size * scale / 1e6:10,.1f}{'' if ms is None else f'{ms * scale:14,.1f}'}")
+    print(f"{'float32 vs raw':24}{raw.memory_usage(index=True, deep=True).sum() / bars32.nbytes:10,.1f}x smaller")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import os
+
+# Base URL of the Polygon API
+POLYGON_BASE_URL = 'https://api.polygon.io'
+
+# Connection pool settings for the shared HTTP session
+POOL_CONNECTIONS = 4  # Number of host pools to keep (all requests go to api.polygon.io)
+POOL_MAXSIZE = 16  # Maximum number of keep-alive connections per host
+POOL_BLOCK = True  # Wait for a free connection instead of opening extra ones beyond POOL_MAXSIZE
+
+# Timeouts in seconds
+CONNECT_TIMEOUT = 3.05  # Time to establish the TCP+TLS connection
+READ_TIMEOUT = 30  # Time to wait for the server to send a response
+
+# Retry policy for rate limited (429), server error (5xx) and reset connections
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 4  # Retries after the first attempt
+BACKOFF_BASE = 0.5  # Seconds; the backoff ceiling doubles on every retry
+BACKOFF_MAX = 30  # Upper bound of a backoff or Retry-After wait in seconds
+
+# Pagination settings for endpoints that return a next_url cursor
+AGGS_PAGE_LIMIT = 50000  # Maximum number of bars per aggregates page
+REFERENCE_PAGE_LIMIT = 1000  # Maximum number of results per reference/news page
+PAGE_PREFETCH = 2  # Number of pages fetched ahead of the consumer
+
+# Date-window chunking for large aggregate ranges
+AGGS_MAX_ROWS = 50000  # Row cap of a single aggregates response
+CHUNK_WORKERS = 4  # Number of windows fetched concurrently
+
+# Maximum number of requests in flight for the async batch client
+ASYNC_MAX_CONCURRENCY = 8
+
+# Requests per minute allowed by each Polygon plan tier (paid tiers are unlimited; stay under ~100 requests/second)
+PLAN_RATE_LIMITS = {
+    'basic': 5,
+    'starter': 6000,
+    'developer': 6000,
+    'advanced': 6000,
+}
+
+# Plan tier of the API_KEY in use, shared by every session in the process
+POLYGON_PLAN = os.environ.get('POLYGON_PLAN', 'basic')
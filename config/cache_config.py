@@ -0,0 +1,44 @@
+import os
+
+# Set the root directory path
+root_dir_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# SQLite file holding aggregate bars that survive restarts and redeploys
+BAR_STORE_PATH = os.environ.get('BAR_STORE_PATH', os.path.join(root_dir_path, '.cache', 'bars.sqlite'))
+
+# Timespans whose bars are kept in the bar store (coarser bars are cheap to refetch)
+BAR_STORE_TIMESPANS = ('minute', 'hour', 'day')
+
+# JSON file keeping the market closures announced by Polygon
+CALENDAR_PATH = os.environ.get('CALENDAR_PATH', os.path.join(root_dir_path, '.cache', 'market_calendar.json'))
+
+# Timezone in which bars are dated
+MARKET_TIMEZONE = 'America/New_York'
+
+# Memory budget of the in-process cache, in bytes; least recently used entries are evicted beyond it
+CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', 512 * 1024 ** 2))
+
+# Cache policy of every endpoint, kept in one place instead of repeated decorator arguments.
+# ttl is in seconds; None keeps an entry until it is evicted to stay within CACHE_MAX_BYTES.
+# max_stale (seconds) lets an expired value be served immediately while it is refreshed in the background;
+# past ttl + max_stale the next caller waits for a fresh value.
+# shareable marks endpoints returning DataFrames, which can be served without a copy in the shared cache mode.
+CACHE_POLICY = {
+    'historical_closed': {'ttl': None, 'shareable': True},  # Unadjusted bars of closed sessions never change
+    'historical_closed_adjusted': {'ttl': 6 * 3600, 'shareable': True},  # Adjusted by Polygon, so a new split changes them
+    'historical_live': {'ttl': 60, 'shareable': True},  # Bars of the current session are still forming
+    'financials': {'ttl': 24 * 3600, 'shareable': True},  # Past filings never change; new ones arrive a few times a year
+    'details': {'ttl': 24 * 3600, 'max_stale': 7 * 24 * 3600},
+    'splits': {'ttl': 6 * 3600, 'max_stale': 24 * 3600, 'shareable': True},
+    'split_history': {'ttl': 6 * 3600, 'shareable': True},  # Never stale, since it adjusts bar prices
+    'dividends': {'ttl': 6 * 3600, 'max_stale': 24 * 3600},
+    'news': {'ttl': 300, 'max_stale': 1800},
+    'market_calendar': {'ttl': 24 * 3600},  # Upcoming closures are announced well ahead
+}
+
+# 'copy' (default) hands every caller a fresh copy of a cached value.
+# 'shared' hands every session the same read-only DataFrame for shareable endpoints, skipping the copy on each hit.
+CACHE_MODE = os.environ.get('CACHE_MODE', 'copy')
+
+# Timespans whose bars belong to a single session, so a range can be split into closed and live parts
+SESSION_TIMESPANS = ('second', 'minute', 'hour', 'day')
@@ -1,10 +1,36 @@
+import pandas as pd
 import streamlit as st
 
+# Rows per page of a comma-formatted table. A pandas Styler formats every cell in Python on each rerun, and
+# the column formats of this Streamlit version cannot group digits, so large tables are formatted a page at a time.
+STYLER_MAX_ROWS = 1000
+
+# Format numeric columns with thousands separators at render time, leaving the data itself numeric
+def format_numbers_for_display(df):
+    numeric_columns = df.select_dtypes(include='number').columns
+    return df.style.format('{:,.2f}', subset=numeric_columns, na_rep='')
+
+# Rows of the page chosen by the user, when a table is too large to format at once
+def select_page(df, key):
+    pages = -(-len(df) // STYLER_MAX_ROWS)
+    if pages <= 1:
+        return df
+    page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1, step=1, key=key)
+    start = (page - 1) * STYLER_MAX_ROWS
+    end = min(start + STYLER_MAX_ROWS, len(df))
+    st.caption(f"Showing rows {start + 1:,}-{end:,} of {len(df):,}. Numbers are formatted {STYLER_MAX_ROWS:,} rows at a time.")
+    return df.iloc[start:end]
+
 # Apply default sort and display the data
-def display_data_with_default_sort(df, sort_column):
+def display_data_with_default_sort(df, sort_column, comma_format=False):
     if not df.empty:
         df_sorted = df.sort_values(by=sort_column, ascending=False)
-        st.dataframe(df_sorted)
+        column_config = {}
+        # Show an index of midnight timestamps as plain dates
+        if isinstance(df_sorted.index, pd.DatetimeIndex) and (df_sorted.index == df_sorted.index.normalize()).all():
+            column_config['_index'] = st.column_config.DateColumn(df_sorted.index.name)
+        data = format_numbers_for_display(select_page(df_sorted, f"page_{sort_column}")) if comma_format else df_sorted
+        st.dataframe(data, column_config=column_config or None)
     else:
         st.error("No data found.")
 
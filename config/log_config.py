@@ -3,7 +3,8 @@ from logging.handlers import TimedRotatingFileHandler
 from datetime import datetime
 import os
 
-# Configure logging
+# Configure the application log file. Core modules log to 'polygon.<module>' child loggers, which stay
+# silent (apart from warnings on stderr) until an application calls this.
 def setup_logging():
     # Set the root directory path
     root_dir_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))     # Get the parent directory of the current file
@@ -19,9 +20,13 @@ def setup_logging():
     log_filename = os.path.join(log_directory, f"polygon_api_{datetime.now().strftime('%Y-%m-%d')}.log")
 
     # Set up logging
-    logger = logging.getLogger(__name__)
+    logger = logging.getLogger('polygon')
     logger.setLevel(logging.INFO)
 
+    # Return the configured logger if another module has already set it up
+    if logger.handlers:
+        return logger
+
     # Set up a TimedRotatingFileHandler
     handler = TimedRotatingFileHandler(
     log_filename,  # Log file name
@@ -0,0 +1,55 @@
+import asyncio
+import contextlib
+import logging
+from polygon_client import PolygonClient
+from config.api_config import ASYNC_MAX_CONCURRENCY
+
+# Initialize the logger (configured by the application, if at all)
+logger = logging.getLogger(f'polygon.{__name__}')
+
+# Map each kind of data to the core client method that retrieves it for one ticker
+FETCHERS = {
+    'historical': lambda client, ticker, **params: client.get_historical_bars(ticker, **params),
+    'financials': lambda client, ticker, **params: client.get_financials_dataframe(ticker, **params),
+    'details': lambda client, ticker, **params: client.get_company_details(ticker),
+    'splits': lambda client, ticker, **params: client.get_stock_splits(ticker, **params),
+    'dividends': lambda client, ticker, **params: client.get_dividends(ticker, **params),
+    'news': lambda client, ticker, **params: client.get_news(ticker, **params),
+}
+
+# Asyncio client that runs the core fetchers concurrently on the shared HTTP session, without Streamlit
+class AsyncPolygonClient:
+    def __init__(self, api_key, max_concurrency=ASYNC_MAX_CONCURRENCY, client=None):
+        self.client = client if client is not None else PolygonClient(api_key)
+        self.max_concurrency = max_concurrency
+
+    # Fetch one kind of data for one ticker without blocking the event loop, holding the semaphore if one is given
+    async def fetch(self, ticker, kind, semaphore=None, **params):
+        if kind not in FETCHERS:
+            raise ValueError(f"Unknown kind '{kind}'. Expected one of: {', '.join(FETCHERS)}")
+        async with semaphore or contextlib.nullcontext():
+            return await asyncio.to_thread(FETCHERS[kind], self.client, ticker, **params)
+
+    # Fetch one kind of data for many tickers, returning results and errors keyed by ticker
+    async def fetch_many(self, tickers, kind, **params):
+        if kind not in FETCHERS:
+            raise ValueError(f"Unknown kind '{kind}'. Expected one of: {', '.join(FETCHERS)}")
+        tickers = list(dict.fromkeys(tickers))  # Drop duplicate tickers, keeping their order
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        logger.info(f"Fetching {kind} for {len(tickers)} ticker(s) with max concurrency {self.max_concurrency}")
+        outcomes = await asyncio.gather(*(self.fetch(ticker, kind, semaphore, **params) for ticker in tickers), return_exceptions=True)
+
+        results, errors = {}, {}
+        for ticker, outcome in zip(tickers, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to fetch {kind} for {ticker}: {outcome}")
+                errors[ticker] = outcome
+            else:
+                results[ticker] = outcome
+        return results, errors
+
+# Fetch one kind of data for many tickers from synchronous code such as a script or a Streamlit page.
+# api_key is keyword-only so that it cannot be taken for the kind.
+def fetch_many(tickers, kind='historical', *, api_key, max_concurrency=ASYNC_MAX_CONCURRENCY, **params):
+    client = AsyncPolygonClient(api_key, max_concurrency)
+    return asyncio.run(client.fetch_many(tickers, kind, **params))
@@ -0,0 +1,228 @@
+import contextlib
+import logging
+import os
+import sqlite3
+import threading
+import pandas as pd
+from market_calendar import get_calendar
+from config.cache_config import BAR_STORE_PATH, MARKET_TIMEZONE
+
+# Initialize the logger (configured by the application, if at all)
+logger = logging.getLogger(f'polygon.{__name__}')
+
+# Columns of an aggregate bar as returned by Polygon
+BAR_COLUMNS = ['t', 'o', 'h', 'l', 'c', 'v', 'vw', 'n']
+
+# coverage holds the date spans fetched per series; market_dates holds the dates whose daily bars
+# were loaded for the whole market at once, which count as covered for every ticker
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL,
+    timespan TEXT NOT NULL,
+    adjusted INTEGER NOT NULL,
+    t INTEGER NOT NULL,
+    o REAL, h REAL, l REAL, c REAL, v REAL, vw REAL, n INTEGER,
+    PRIMARY KEY (ticker, timespan, adjusted, t)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker TEXT NOT NULL,
+    timespan TEXT NOT NULL,
+    adjusted INTEGER NOT NULL,
+    from_date TEXT NOT NULL,
+    to_date TEXT NOT NULL,
+    PRIMARY KEY (ticker, timespan, adjusted, from_date)
+);
+CREATE TABLE IF NOT EXISTS market_dates (
+    date TEXT NOT NULL,
+    adjusted INTEGER NOT NULL,
+    tickers INTEGER NOT NULL,
+    PRIMARY KEY (date, adjusted)
+);
+"""
+
+# Epoch milliseconds of midnight in the market timezone at the start of the given date
+def date_to_ms(date):
+    return int(pd.Timestamp(date).tz_localize(MARKET_TIMEZONE).value // 1_000_000)
+
+# Shift a 'YYYY-MM-DD' date by a number of days
+def shift_date(date, days):
+    return (pd.Timestamp(date) + pd.Timedelta(days=days)).strftime('%Y-%m-%d')
+
+# Last date whose session is over, as 'YYYY-MM-DD' in the market timezone
+def last_closed_date():
+    return (pd.Timestamp.now(tz=MARKET_TIMEZONE).normalize() - pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+
+# Merge overlapping or adjacent (next-day) date spans into disjoint spans sorted by start
+def merge_spans(spans):
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= shift_date(merged[-1][1], 1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+# Sub-ranges of [from_date, to_date] that are not covered by any of the spans
+def subtract_spans(from_date, to_date, spans):
+    gaps = []
+    cursor = from_date
+    for start, end in merge_spans(spans):
+        if end < cursor:
+            continue
+        if start > to_date:
+            break
+        if start > cursor:
+            gaps.append((cursor, shift_date(start, -1)))
+        cursor = shift_date(end, 1)
+        if cursor > to_date:
+            return gaps
+    gaps.append((cursor, to_date))
+    return gaps
+
+# Local SQLite store of aggregate bars, keyed by ticker, timespan and adjusted flag
+class BarStore:
+    def __init__(self, path=BAR_STORE_PATH):
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._counters = {'hits': 0, 'partial_hits': 0, 'misses': 0, 'bars_read': 0, 'bars_written': 0}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    # Open a connection for the calling thread, committing and closing it on exit
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self._counters[key] += value
+
+    # Date spans already held for a series, as (from_date, to_date) tuples sorted by start
+    def coverage(self, ticker, timespan, adjusted):
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT from_date, to_date FROM coverage WHERE ticker = ? AND timespan = ? AND adjusted = ? ORDER BY from_date',
+                (ticker, timespan, int(adjusted)),
+            ).fetchall()
+        spans = [tuple(row) for row in rows]
+        if timespan == 'day':
+            spans = merge_spans(spans + [(date, date) for date in self.market_dates(adjusted)])
+        return spans
+
+    # Dates whose daily bars are held for the whole market, sorted
+    def market_dates(self, adjusted):
+        with self._connect() as conn:
+            rows = conn.execute('SELECT date FROM market_dates WHERE adjusted = ? ORDER BY date', (int(adjusted),)).fetchall()
+        return [row[0] for row in rows]
+
+    # Date ranges within [from_date, to_date] that are not on disk yet
+    def missing_ranges(self, ticker, timespan, adjusted, from_date, to_date):
+        missing = self._trading_gaps(ticker, timespan, adjusted, from_date, to_date)
+        if not missing:
+            self._count(hits=1)
+        elif missing == [(from_date, to_date)]:
+            self._count(misses=1)
+        else:
+            self._count(partial_hits=1)
+        return missing
+
+    # Whether every date of [from_date, to_date] is on disk, without counting it as a lookup
+    def covers(self, ticker, timespan, adjusted, from_date, to_date):
+        return not self._trading_gaps(ticker, timespan, adjusted, from_date, to_date)
+
+    # Gaps of [from_date, to_date] not on disk, leaving out gaps of only weekends and holidays, which have no bars to fetch
+    def _trading_gaps(self, ticker, timespan, adjusted, from_date, to_date):
+        calendar = get_calendar()
+        missing = subtract_spans(from_date, to_date, self.coverage(ticker, timespan, adjusted))
+        return [(start, end) for start, end in missing if calendar.has_trading_days(start, end)]
+
+    # Write fetched bars and record the fetched (from_date, to_date) spans as held, even when they had no bars
+    def write(self, ticker, timespan, adjusted, bars, spans):
+        rows = []
+        if not bars.empty:
+            frame = bars.reindex(columns=BAR_COLUMNS)
+            frame = frame.astype(object).where(frame.notna(), None)  # Store missing values as NULL
+            rows = [(ticker, timespan, int(adjusted), *values) for values in frame.itertuples(index=False, name=None)]
+        key = (ticker, timespan, int(adjusted))
+        with self._write_lock, self._connect() as conn:
+            conn.executemany('INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            # Keep the coverage of each series as a set of disjoint spans
+            held = conn.execute('SELECT from_date, to_date FROM coverage WHERE ticker = ? AND timespan = ? AND adjusted = ?', key).fetchall()
+            conn.execute('DELETE FROM coverage WHERE ticker = ? AND timespan = ? AND adjusted = ?', key)
+            conn.executemany('INSERT INTO coverage VALUES (?, ?, ?, ?, ?)', [(*key, start, end) for start, end in merge_spans(held + list(spans))])
+        self._count(bars_written=len(rows))
+        logger.info(f"Stored {len(rows)} {timespan} bars for {ticker} (adjusted={adjusted}) covering {len(spans)} span(s)")
+
+    # Write the daily bars of every ticker for one date (a 'ticker' column plus bar columns) and record the date as held
+    # The grouped endpoint stamps bars at the 16:00 close, so they are re-stamped at midnight like per-ticker daily bars,
+    # and any other bar a ticker already has on that date is replaced instead of kept next to it.
+    def write_market_date(self, date, adjusted, bars):
+        rows = []
+        if not bars.empty:
+            frame = bars.reindex(columns=['ticker'] + BAR_COLUMNS).assign(t=date_to_ms(date))
+            frame = frame.astype(object).where(frame.notna(), None)  # Store missing values as NULL
+            rows = [(ticker, 'day', int(adjusted), *values) for ticker, *values in frame.itertuples(index=False, name=None)]
+        day = (date_to_ms(date), date_to_ms(shift_date(date, 1)))
+        with self._write_lock, self._connect() as conn:
+            conn.executemany(
+                "DELETE FROM bars WHERE ticker = ? AND timespan = 'day' AND adjusted = ? AND t >= ? AND t < ?",
+                [(row[0], int(adjusted), *day) for row in rows],
+            )
+            conn.executemany('INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            conn.execute('INSERT OR REPLACE INTO market_dates VALUES (?, ?, ?)', (date, int(adjusted), len(rows)))
+        self._count(bars_written=len(rows))
+        logger.info(f"Stored {len(rows)} daily bars for the market on {date} (adjusted={adjusted})")
+
+    # Read the stored daily bars of many tickers (all when tickers is None) as a long frame with a 'ticker' column
+    def read_market(self, adjusted, from_date, to_date, tickers=None):
+        query = f"SELECT ticker, {', '.join(BAR_COLUMNS)} FROM bars WHERE timespan = 'day' AND adjusted = ? AND t >= ? AND t < ?"
+        params = [int(adjusted), date_to_ms(from_date), date_to_ms(shift_date(to_date, 1))]
+        if tickers is not None:
+            tickers = list(tickers)
+            query += f" AND ticker IN ({', '.join('?' * len(tickers))})"
+            params += tickers
+        with self._connect() as conn:
+            bars = pd.read_sql_query(query + ' ORDER BY ticker, t', conn, params=params)
+        self._count(bars_read=len(bars))
+        return bars
+
+    # Read the stored bars of [from_date, to_date] in time order
+    def read(self, ticker, timespan, adjusted, from_date, to_date):
+        with self._connect() as conn:
+            bars = pd.read_sql_query(
+                f"SELECT {', '.join(BAR_COLUMNS)} FROM bars WHERE ticker = ? AND timespan = ? AND adjusted = ? AND t >= ? AND t < ? ORDER BY t",
+                conn,
+                params=(ticker, timespan, int(adjusted), date_to_ms(from_date), date_to_ms(shift_date(to_date, 1))),
+            )
+        self._count(bars_read=len(bars))
+        return bars
+
+    # Lookup counters and the share of lookups served entirely from disk
+    def stats(self):
+        with self._stats_lock:
+            counters = dict(self._counters)
+        lookups = counters['hits'] + counters['partial_hits'] + counters['misses']
+        counters['hit_ratio'] = counters['hits'] / lookups if lookups else 0.0
+        return counters
+
+# Process-wide store shared by every session
+_store = None
+_store_lock = threading.Lock()
+
+# Get the shared bar store, creating the database on first use
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = BarStore()
+    return _store
@@ -0,0 +1,172 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import rate_limiter
+from polygon_client import PolygonClient
+from config.api_config import ASYNC_MAX_CONCURRENCY, CHUNK_WORKERS
+
+# Initialize the logger (configured by the application, if at all)
+logger = logging.getLogger(f'polygon.{__name__}')
+
+# Kinds of data the exporter can write
+EXPORT_KINDS = ('historical', 'financials')
+
+# Name of the checkpoint file kept in the output directory
+CHECKPOINT_FILE = '_checkpoint.json'
+
+# Read tickers from a file with one ticker per line, skipping blank lines, comments and duplicates
+def read_tickers(path):
+    with open(path, encoding='utf-8') as f:
+        tickers = [line.split('#', 1)[0].strip().upper() for line in f]
+    return list(dict.fromkeys(ticker for ticker in tickers if ticker))
+
+# Write a file by renaming a finished temporary file over it, so an interrupted run never leaves a partial file
+def write_atomically(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    write(temporary_path)
+    os.replace(temporary_path, path)
+
+# Completed (kind, ticker) pairs of an export job, persisted after every pair so a rerun resumes where it stopped
+class Checkpoint:
+    def __init__(self, out_dir, job):
+        self.path = os.path.join(out_dir, CHECKPOINT_FILE)
+        self.job = job
+        self._lock = threading.Lock()
+        self.done = {kind: [] for kind in job['kinds']}
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved['job'] != job:
+                raise SystemExit(f"{self.path} belongs to a different export ({saved['job']}); use another --out directory or pass --restart")
+            self.done.update(saved['done'])
+
+    def is_done(self, kind, ticker):
+        return ticker in self.done[kind]
+
+    def mark_done(self, kind, ticker):
+        with self._lock:
+            self.done[kind].append(ticker)
+            write_atomically(self.path, self._save)
+
+    def _save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'job': self.job, 'done': self.done}, f, indent=1)
+
+# Parquet file of one ticker, partitioned Hive-style so a directory can be read back as one dataset
+def partition_path(out_dir, kind, ticker, job):
+    if kind == 'historical':
+        return os.path.join(out_dir, kind, f"timespan={job['timespan']}", f"ticker={ticker}", f"{job['from_date']}_{job['to_date']}.parquet")
+    return os.path.join(out_dir, kind, f"ticker={ticker}", f"{job['from_date']}_{job['to_date']}.parquet")
+
+# Fetch one kind of data for one ticker and write it to its partition, returning the number of rows
+def export_one(client, kind, ticker, job, out_dir):
+    if kind == 'historical':
+        df = client.get_historical_bars(ticker, job['from_date'], job['to_date'], job['adjusted'], job['timespan'])
+        df = df.reset_index()  # Keep the market-time Date as a column in the Parquet file
+    else:
+        # Filings are bounded by their filing date, like bars by their date
+        df = client.get_financials_dataframe(ticker, job['financials_limit'], gte=job['from_date'], lte=job['to_date'])
+    if not df.empty:
+        write_atomically(partition_path(out_dir, kind, ticker, job), lambda path: df.to_parquet(path, index=False))
+    return len(df)
+
+# Running totals of an export, reported as rows/s and requests/s
+class Progress:
+    def __init__(self, total):
+        self.total = total
+        self.completed = 0
+        self.rows = 0
+        self.started = time.perf_counter()
+        self.requests_at_start = rate_limiter.get_limiter().stats()['acquired']
+
+    def update(self, kind, ticker, rows=None, error=None):
+        self.completed += 1
+        self.rows += rows or 0
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        requests = rate_limiter.get_limiter().stats()['acquired'] - self.requests_at_start
+        outcome = f"failed: {error}" if error is not None else f"{rows:,} rows"
+        print(f"[{self.completed}/{self.total}] {kind} {ticker}: {outcome} | {self.rows / elapsed:,.0f} rows/s, {requests / elapsed:,.1f} requests/s", flush=True)
+
+    def summary(self, failures):
+        elapsed = time.perf_counter() - self.started
+        requests = rate_limiter.get_limiter().stats()['acquired'] - self.requests_at_start
+        return f"Exported {self.rows:,} rows with {requests:,} requests in {elapsed:,.1f}s ({failures} failed)"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Export Polygon data for many tickers to partitioned Parquet files.')
+    parser.add_argument('tickers', help='File with one ticker per line')
+    parser.add_argument('--from', dest='from_date', required=True, help='First date, YYYY-MM-DD')
+    parser.add_argument('--to', dest='to_date', required=True, help='Last date, YYYY-MM-DD')
+    parser.add_argument('--out', default='export', help='Output directory (default: export)')
+    parser.add_argument('--kinds', default='historical', help=f"Comma-separated kinds to export: {', '.join(EXPORT_KINDS)}")
+    parser.add_argument('--timespan', default='day', help='Bar timespan for historical data (default: day)')
+    parser.add_argument('--unadjusted', action='store_true', help='Export bars that are not adjusted for splits')
+    parser.add_argument('--financials-limit', type=int, default=100, help='Most filings per ticker for financials, filed within --from/--to (default: 100)')
+    parser.add_argument('--concurrency', type=int, default=ASYNC_MAX_CONCURRENCY, help='Tickers fetched at once')
+    parser.add_argument('--workers', type=int, default=CHUNK_WORKERS, help='Concurrent date windows per ticker')
+    parser.add_argument('--api-key', default=os.environ.get('POLYGON_API_KEY'), help='Polygon API key (default: $POLYGON_API_KEY)')
+    parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint and export everything again')
+    parser.add_argument('--verbose', action='store_true', help='Log requests and retries to stderr')
+    args = parser.parse_args(argv)
+    args.kinds = [kind.strip() for kind in args.kinds.split(',') if kind.strip()]
+    unknown = [kind for kind in args.kinds if kind not in EXPORT_KINDS]
+    if unknown:
+        parser.error(f"Unknown kind(s) {', '.join(unknown)}. Expected: {', '.join(EXPORT_KINDS)}")
+    if not args.api_key:
+        parser.error('An API key is required: pass --api-key or set POLYGON_API_KEY')
+    return args
+
+# Export every (kind, ticker) pair not yet in the checkpoint, under the shared rate limit
+def main(argv=None):
+    args = parse_args(argv)
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    tickers = read_tickers(args.tickers)
+    job = {
+        'kinds': args.kinds, 'from_date': args.from_date, 'to_date': args.to_date, 'timespan': args.timespan,
+        'adjusted': not args.unadjusted, 'financials_limit': args.financials_limit,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    if args.restart and os.path.exists(os.path.join(args.out, CHECKPOINT_FILE)):
+        os.remove(os.path.join(args.out, CHECKPOINT_FILE))
+    checkpoint = Checkpoint(args.out, job)
+
+    pending = [(kind, ticker) for kind in args.kinds for ticker in tickers if not checkpoint.is_done(kind, ticker)]
+    skipped = len(args.kinds) * len(tickers) - len(pending)
+    print(f"{len(pending)} export(s) to run for {len(tickers)} ticker(s){f', {skipped} already done' if skipped else ''}", flush=True)
+
+    client = PolygonClient(args.api_key, workers=args.workers)
+    progress = Progress(len(pending))
+    failures = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency), thread_name_prefix='polygon-export') as executor:
+        futures = {executor.submit(export_one, client, kind, ticker, job, args.out): (kind, ticker) for kind, ticker in pending}
+        for future in as_completed(futures):
+            kind, ticker = futures[future]
+            try:
+                rows = future.result()
+            except Exception as e:
+                # Leave the pair out of the checkpoint so the next run retries it
+                failures += 1
+                logger.error(f"Failed to export {kind} for {ticker}: {e}")
+                progress.update(kind, ticker, error=e)
+                continue
+            checkpoint.mark_done(kind, ticker)
+            progress.update(kind, ticker, rows)
+
+    print(progress.summary(failures), flush=True)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,47 @@
+import contextlib
+import copy
+import functools
+import inspect
+import streamlit as st
+from bar_store import last_closed_date, shift_date
+from memory_cache import call_key, get_cache
+from shared_frames import freeze_frame
+from config.cache_config import CACHE_POLICY, CACHE_MODE, SESSION_TIMESPANS
+
+# Cache decorator configured from the policy of an endpoint, storing results in the byte-bounded memory cache.
+# Callers get a copy of the cached value, or in the shared mode the read-only cached frame itself.
+# Endpoints with max_stale serve an expired value while it is refreshed in the background.
+def cached(endpoint, show_spinner='Fetching data from API...'):
+    policy = CACHE_POLICY[endpoint]
+    shared = CACHE_MODE == 'shared' and policy.get('shareable', False)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        spinner_text = show_spinner if isinstance(show_spinner, str) else f"Running {func.__name__}(...)."
+
+        def compute(args, kwargs, spinner=True):
+            with st.spinner(spinner_text) if show_spinner and spinner else contextlib.nullcontext():
+                return func(*args, **kwargs)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = call_key(func, signature, args, kwargs)
+            value = get_cache().get_or_compute(
+                key, endpoint, policy['ttl'], lambda: compute(args, kwargs),
+                max_stale=policy.get('max_stale'),
+                refresh=lambda: compute(args, kwargs, spinner=False),  # Background threads have no page to show a spinner on
+                freeze=freeze_frame if shared else None,  # Frozen after the cache has measured the value
+            )
+            return value if shared else copy.deepcopy(value)
+        return wrapper
+    return decorator
+
+# Split a bar request into its closed part (cached indefinitely) and live part (refreshed often)
+def split_by_session(from_date, to_date, timespan):
+    closed_to_date = last_closed_date()
+    if to_date <= closed_to_date:
+        return (from_date, to_date), None
+    # Coarser bars such as weeks or months straddle today, so the whole range stays live
+    if from_date > closed_to_date or timespan not in SESSION_TIMESPANS:
+        return None, (from_date, to_date)
+    return (from_date, closed_to_date), (shift_date(closed_to_date, 1), to_date)
@@ -1,11 +1,59 @@
+from datetime import timedelta
+import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
+from ohlcv import OHLCVBars
 
-# Plot a Candlestick Chart
-def plot_candlestick_chart(df):
-    fig = go.Figure(data=[go.Candlestick(x=df['Date'],
-                open=df['Open'], high=df['High'],
-                low=df['Low'], close=df['Close'])])
+# Maximum number of candles sent to the browser
+MAX_CANDLES = 1500
 
-    fig.update_layout(title='Candlestick Chart', xaxis_rangeslider_visible=False)
+# Candle sizes from finest to coarsest, with their approximate length for choosing one
+CANDLE_RULES = [
+    ('1min', pd.Timedelta(minutes=1)), ('5min', pd.Timedelta(minutes=5)), ('15min', pd.Timedelta(minutes=15)),
+    ('30min', pd.Timedelta(minutes=30)), ('1h', pd.Timedelta(hours=1)), ('4h', pd.Timedelta(hours=4)),
+    ('1D', pd.Timedelta(days=1)), ('W', pd.Timedelta(weeks=1)), ('MS', pd.Timedelta(days=31)),
+    ('QS', pd.Timedelta(days=92)), ('YS', pd.Timedelta(days=366)),
+]
+
+# Aggregation of each OHLCV column when merging bars into a coarser candle
+OHLC_AGGREGATION = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+# Finest candle size that keeps a time span under max_candles
+def choose_candle_rule(span, max_candles=MAX_CANDLES):
+    return next((rule for rule, length in CANDLE_RULES if span / length <= max_candles), CANDLE_RULES[-1][0])
+
+# Aggregate bars into at most about max_candles candles, returning the candles and the candle size used
+def downsample_ohlc(df, max_candles=MAX_CANDLES):
+    if len(df) <= max_candles:
+        return df, None
+    rule = choose_candle_rule(df.index[-1] - df.index[0], max_candles)
+    candles = df.resample(rule).agg(OHLC_AGGREGATION).dropna(subset=['Open'])  # Drop buckets without trading
+    return candles, rule
+
+# Plot a Candlestick Chart of an OHLCV DataFrame or OHLCVBars
+def plot_candlestick_chart(df, max_candles=MAX_CANDLES):
+    if isinstance(df, OHLCVBars):
+        df = df.to_pandas()
+    visible = df
+    if len(df) > max_candles:
+        # Let the user zoom into a range, which is then re-aggregated at a finer resolution
+        local_index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+        intraday = bool((local_index != local_index.normalize()).any())
+        start, end = st.slider(
+            'Chart range',
+            min_value=local_index[0].to_pydatetime(),
+            max_value=local_index[-1].to_pydatetime(),
+            value=(local_index[0].to_pydatetime(), local_index[-1].to_pydatetime()),
+            step=timedelta(minutes=1) if intraday else timedelta(days=1),
+            format='YYYY-MM-DD HH:mm' if intraday else 'YYYY-MM-DD',
+        )
+        visible = df[(local_index >= start) & (local_index <= end)]
+
+    candles, rule = downsample_ohlc(visible, max_candles)
+    fig = go.Figure(data=[go.Candlestick(x=candles.index,
+                open=candles['Open'], high=candles['High'],
+                low=candles['Low'], close=candles['Close'])])
+
+    title = 'Candlestick Chart' if rule is None else f'Candlestick Chart ({rule} candles from {len(visible):,} bars)'
+    fig.update_layout(title=title, xaxis_rangeslider_visible=False)
     st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,95 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+from requests.adapters import HTTPAdapter
+import rate_limiter
+from singleflight import SingleFlight
+from config.api_config import POOL_CONNECTIONS, POOL_MAXSIZE, POOL_BLOCK, CONNECT_TIMEOUT, READ_TIMEOUT, RETRY_STATUS_CODES, MAX_RETRIES, BACKOFF_BASE, BACKOFF_MAX
+
+# Initialize the logger (configured by the application, if at all)
+logger = logging.getLogger(f'polygon.{__name__}')
+
+# Process-wide session shared by every fetcher
+_session = None
+_session_lock = threading.Lock()
+
+# Coalesces identical requests that are in flight at the same time, across all sessions
+_in_flight = SingleFlight()
+
+# Create the pooled session on first use
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, pool_block=POOL_BLOCK)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+                logger.info(f"Created shared HTTP session (pool_maxsize={POOL_MAXSIZE}, timeout=({CONNECT_TIMEOUT}, {READ_TIMEOUT}))")
+    return _session
+
+# Exponential backoff with full jitter for the given retry attempt (0-based)
+def backoff_delay(attempt):
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+# Seconds to wait according to a Retry-After header (delay-seconds or HTTP-date), or None
+def retry_after_delay(response):
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            delay = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(BACKOFF_MAX, max(0.0, delay))
+
+# Canonical form of a request: lower-cased host and query parameters (including apiKey) in sorted order
+def canonical_request_key(url, params=None):
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + [(key, str(value)) for key, value in (params or {}).items()]
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(sorted(query)), ''))
+
+# Send a GET request, waiting on an identical request already in flight instead of sending a duplicate
+def get(url, params=None):
+    return _in_flight.do(canonical_request_key(url, params), _get_with_retries, url, params)
+
+# Counters of upstream and deduplicated requests
+def coalescing_stats():
+    return _in_flight.stats()
+
+# Send a GET request through the shared rate limiter and session with connect/read timeouts,
+# retrying 429/5xx responses and reset connections with backoff
+def _get_with_retries(url, params=None):
+    for attempt in range(MAX_RETRIES + 1):
+        rate_limiter.get_limiter().acquire()
+        try:
+            response = get_session().get(url, params=params, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        except requests.ConnectionError as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"Connection error ({e.__class__.__name__}), retrying in {delay:.2f}s (attempt {attempt + 1}/{MAX_RETRIES})")
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+                return response
+            retry_after = retry_after_delay(response)
+            delay = retry_after if retry_after is not None else backoff_delay(attempt)
+            logger.warning(f"HTTP {response.status_code}, retrying in {delay:.2f}s (attempt {attempt + 1}/{MAX_RETRIES})")
+        time.sleep(delay)
+
+# Error raised when the Polygon API returns a non-200 response
+class PolygonAPIError(Exception):
+    def __init__(self, status_code, text):
+        super().__init__(f"API request failed with status code {status_code}: {text}")
+        self.status_code = status_code
+        self.text = text
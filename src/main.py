@@ -2,8 +2,10 @@ import streamlit as st
 import streamlit_authenticator as sa
 import pandas as pd
 from datetime import datetime
-from polygon_api import get_historical_data_as_df, get_financials_as_df, create_financials_dataframe, get_company_details, get_stock_splits, get_dividends_data, get_news
+from polygon_api import get_historical_data_as_df, date_view, get_financials_dataframe, get_company_details, get_stock_splits, get_dividends_data, get_news
 from chart import plot_candlestick_chart
+from bar_store import get_store
+from memory_cache import get_cache
 from config.display_config import display_data_with_default_sort, escape_markdown
 from authenticator import authenticate
 
@@ -54,6 +56,13 @@ st.session_state.app_mode = st.sidebar.selectbox(
     ['Select', 'Company Detail', 'Historical Stock Data', 'Company Financials Data', 'Stock Splits Data', 'Dividends Data']
 )
 
+# Memory held by the data cache, broken down by endpoint
+with st.sidebar.expander('Cache usage'):
+    cache_stats = get_cache().stats()
+    st.caption(f"{cache_stats['bytes'] / 1e6:,.1f} of {cache_stats['max_bytes'] / 1e6:,.0f} MB in {cache_stats['entries']} entries")
+    if cache_stats['endpoints']:
+        st.dataframe(pd.DataFrame.from_dict(cache_stats['endpoints'], orient='index'))
+
 
 # Top-level header
 if st.session_state.app_mode == 'Select' and st.session_state['authenticated']:
@@ -100,16 +109,27 @@ elif st.session_state.app_mode is 'Historical Stock Data' and st.session_state['
     from_date = st.date_input('From date', datetime(2022, 1, 1))
     to_date = st.date_input('To date', datetime.today())
     adjusted = st.checkbox('Adjust for stock splits', value=True)  # checkbox default value is True for adjusted
+    derive_from_minute = st.checkbox('Derive from stored minute bars when available', value=True)  # Avoids refetching when switching timespan
 
+    historical_request = (ticker, from_date.strftime("%Y-%m-%d"), to_date.strftime("%Y-%m-%d"), adjusted, timespan)
     if st.button('Get Historical Data'):
-        df = get_historical_data_as_df(ticker, from_date.strftime("%Y-%m-%d"), to_date.strftime("%Y-%m-%d"), adjusted, timespan, API_KEY)
+        st.session_state['historical_request'] = historical_request
+
+    # Keep showing the requested data on reruns, e.g. when the chart range is changed
+    if st.session_state.get('historical_request') == historical_request:
+        df = get_historical_data_as_df(*historical_request, API_KEY, derive_from_minute=derive_from_minute)
         if not df.empty:
             # Plot candlestick chart
             plot_candlestick_chart(df)
-            display_data_with_default_sort(df, 'Date')
+            # Intraday bars keep their timestamps; daily and coarser bars are listed by date
+            display_data_with_default_sort(df if timespan in ('minute', 'hour') else date_view(df), 'Date', comma_format=True)
         else:
             st.error("No historical data found.")
 
+        # Show how much of the bar data was served from the local bar store
+        store_stats = get_store().stats()
+        st.caption(f"Bar store hit ratio: {store_stats['hit_ratio']:.0%} ({store_stats['hits']} hits, {store_stats['partial_hits']} partial hits, {store_stats['misses']} misses)")
+
 
 # Financials Data
 elif st.session_state.app_mode is 'Company Financials Data' and st.session_state['authenticated'] is True:
@@ -122,9 +142,8 @@ elif st.session_state.app_mode is 'Company Financials Data' and st.session_state
     if st.button('Get Financials'):
         # Pass None if the selected option is 'None'
         timeframe_to_pass = None if timeframe == '' else timeframe
-        financials_data = get_financials_as_df(ticker, limit, API_KEY, timeframe=timeframe_to_pass)
-        df_financials = create_financials_dataframe(financials_data)
-        display_data_with_default_sort(df_financials, 'End Date')
+        df_financials = get_financials_dataframe(ticker, limit, API_KEY, timeframe=timeframe_to_pass)
+        display_data_with_default_sort(df_financials, 'End Date', comma_format=True)
 
 
 # Company Detail
@@ -220,7 +239,7 @@ elif st.session_state.app_mode is 'Stock Splits Data' and st.session_state['auth
         lt = lt_date.strftime('%Y-%m-%d') if lt_date else ''
         lte = lte_date.strftime('%Y-%m-%d') if lte_date else ''
 
-    limit = st.number_input('Limit', min_value=1, max_value=1000, value=50, step=1)
+    limit = st.number_input('Limit', min_value=1, max_value=10000, value=50, step=1)
 
     if st.button('Get Stock Splits'):
         # Create a dictionary of date filters
@@ -232,7 +251,7 @@ elif st.session_state.app_mode is 'Stock Splits Data' and st.session_state['auth
 elif st.session_state.app_mode is 'Dividends Data' and st.session_state['authenticated'] is True:
     st.header("Dividends Data")
     ticker = st.text_input('Enter ticker symbol', 'AAPL').upper()
-    limit = st.number_input('Limit', min_value=1, max_value=1000, value=50, step=1)
+    limit = st.number_input('Limit', min_value=1, max_value=10000, value=50, step=1)
 
     if st.button('Get Dividends'):
         dividends_data = get_dividends_data(ticker, limit, API_KEY)
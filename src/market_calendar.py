@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import threading
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import MO
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, Holiday, GoodFriday, USPresidentsDay, USMemorialDay, USLaborDay, USThanksgivingDay,
+    nearest_workday, sunday_to_monday,
+)
+from pandas.tseries.offsets import DateOffset
+from config.cache_config import CALENDAR_PATH
+
+# Initialize the logger (configured by the application, if at all)
+logger = logging.getLogger(f'polygon.{__name__}')
+
+# First date the calendar covers; holidays are generated from here to two years ahead
+CALENDAR_START = '1990-01-01'
+
+# Exchanges whose closures apply to US stock sessions
+CALENDAR_EXCHANGES = ('NYSE', 'NASDAQ')
+
+# Unscheduled full-day closures that no rule produces
+SPECIAL_CLOSURES = [
+    '2001-09-11', '2001-09-12', '2001-09-13', '2001-09-14',  # September 11 attacks
+    '2004-06-11',  # Funeral of President Reagan
+    '2007-01-02',  # Funeral of President Ford
+    '2012-10-29', '2012-10-30',  # Hurricane Sandy
+    '2018-12-05',  # Funeral of President George H. W. Bush
+    '2025-01-09',  # Funeral of President Carter
+]
+
+# NYSE full-day holidays as rules
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),  # Not observed on the Friday before when it falls on a Saturday
+        Holiday('Martin Luther King Jr. Day', month=1, day=1, start_date='1998-01-01', offset=DateOffset(weekday=MO(3))),
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas Day', month=12, day=25, observance=nearest_workday),
+    ]
+
+# Read the closures announced by Polygon from the local calendar file
+def load_announced_closures(path=CALENDAR_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('closures', [])
+
+# Trading days of US stock exchanges, from holiday rules plus closures announced by Polygon.
+# Dates are naive midnight timestamps or 'YYYY-MM-DD' strings in the market timezone.
+class MarketCalendar:
+    def __init__(self, closures=()):
+        end = pd.Timestamp.today().normalize() + pd.DateOffset(years=2)
+        holidays = NYSEHolidayCalendar().holidays(CALENDAR_START, end)
+        self.holidays = holidays.union(pd.DatetimeIndex(SPECIAL_CLOSURES + list(closures))).normalize()
+        self._holiday_days = self.holidays.asi8 // 86_400_000_000_000  # Days since the epoch, for vectorized lookups
+
+    # Whether each date is a trading day, vectorized over any array of dates
+    def is_trading_day(self, dates):
+        dates = pd.DatetimeIndex(pd.to_datetime(dates))
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+        days = dates.normalize().asi8 // 86_400_000_000_000
+        return np.asarray(dates.dayofweek < 5) & ~np.isin(days, self._holiday_days)
+
+    # Trading days of [from_date, to_date] as a DatetimeIndex
+    def trading_days(self, from_date, to_date):
+        days = pd.date_range(pd.Timestamp(from_date).normalize(), pd.Timestamp(to_date).normalize(), freq='D')
+        return days[self.is_trading_day(days)]
+
+    # First and last trading day of [from_date, to_date] as 'YYYY-MM-DD' strings, or None without any
+    def trading_bounds(self, from_date, to_date):
+        days = self.trading_days(from_date, to_date)
+        if days.empty:
+            return None
+        return days[0].strftime('%Y-%m-%d'), days[-1].strftime('%Y-%m-%d')
+
+    # Whether [from_date, to_date] contains at least one trading day
+    def has_trading_days(self, from_date, to_date):
+        return self.trading_bounds(from_date, to_date) is not None
+
+# Process-wide calendar, rebuilt when new closures are announced
+_calendar = None
+_calendar_lock = threading.Lock()
+
+# Get the shared market calendar
+def get_calendar():
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = MarketCalendar(load_announced_closures())
+    return _calendar
+
+# Fetch the upcoming closures announced by Polygon, keep them in the local calendar file and rebuild the calendar.
+# Closures already on file are kept, so unscheduled closures stay known after their date has passed.
+def refresh_calendar(client, path=CALENDAR_PATH):
+    global _calendar
+    upcoming = client.fetch_upcoming_market_holidays()
+    announced = {item['date'] for item in upcoming if item.get('exchange') in CALENDAR_EXCHANGES and item.get('status') == 'closed'}
+    closures = sorted(set(load_announced_closures(path)) | announced)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as f:
+        json.dump({'closures': closures}, f, indent=1)
+    os.replace(temporary_path, path)
+    with _calendar_lock:
+        _calendar = MarketCalendar(closures)
+    logger.info(f"Market calendar refreshed with {len(announced)} upcoming closure(s)")
+    return closures
@@ -0,0 +1,76 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import bar_store
+from market_calendar import get_calendar
+from polygon_client import PolygonClient
+from split_adjust import adjust_for_splits
+from config.api_config import CHUNK_WORKERS
+from config.cache_config import MARKET_TIMEZONE
+
+# Initialize the logger (configured by the application, if at all)
+logger = logging.getLogger(f'polygon.{__name__}')
+
+# Dates of [from_date, to_date] whose market-wide daily bars are not in the store yet, as 'YYYY-MM-DD' strings
+def missing_market_dates(store, from_date, to_date):
+    held = set(store.market_dates(False))
+    return [date for date in pd.date_range(from_date, to_date, freq='D').strftime('%Y-%m-%d') if date not in held]
+
+# Fill the bar store with the daily bars of every ticker for each closed date of a range, one grouped request per date.
+# Weekends and holidays are recorded as held without a request; dates already held are skipped. Returns the bars written per date.
+def load_market_range(client, from_date, to_date, workers=CHUNK_WORKERS):
+    store = client.store()
+    to_date = min(to_date, bar_store.last_closed_date())  # Bars of the current session are not final yet
+    dates = missing_market_dates(store, from_date, to_date) if from_date <= to_date else []
+    trading_days = [date for date, is_open in zip(dates, get_calendar().is_trading_day(dates)) if is_open]
+    for date in set(dates) - set(trading_days):
+        store.write_market_date(date, False, pd.DataFrame())
+
+    # Each date is independent, so dates are fetched concurrently under the shared rate limit
+    def load_date(date):
+        bars = client.fetch_grouped_daily(date)
+        store.write_market_date(date, False, bars)
+        return date, len(bars)
+
+    logger.info(f"Loading market-wide daily bars for {len(trading_days)} date(s) from {from_date} to {to_date} with {workers} worker(s)")
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(trading_days) or 1)), thread_name_prefix='polygon-market') as executor:
+        return dict(executor.map(load_date, trading_days))
+
+# Pivot stored daily bars into one column per ticker on a market-time 'Date' index, e.g. field='c' for closes.
+# With adjusted=True the prices of each ticker are split-adjusted, which needs one split request per ticker.
+def market_history(client, from_date, to_date, tickers=None, field='c', adjusted=False):
+    bars = client.store().read_market(False, from_date, to_date, tickers)
+    if bars.empty:
+        return pd.DataFrame()
+    if adjusted:
+        bars = pd.concat([adjust_for_splits(group, client.split_history(ticker)) for ticker, group in bars.groupby('ticker', sort=False)])
+    wide = bars.pivot(index='t', columns='ticker', values=field)
+    dates = pd.to_datetime(wide.index.to_numpy(), unit='ms', utc=True).tz_convert(MARKET_TIMEZONE).rename('Date')
+    return wide.set_axis(dates).rename_axis(columns=None)
+
+# Load market-wide daily bars for a date range from the command line
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load daily bars of every US stock into the local bar store, one request per date.')
+    parser.add_argument('--from', dest='from_date', required=True, help='First date, YYYY-MM-DD')
+    parser.add_argument('--to', dest='to_date', required=True, help='Last date, YYYY-MM-DD')
+    parser.add_argument('--workers', type=int, default=CHUNK_WORKERS, help='Dates fetched at once')
+    parser.add_argument('--api-key', default=os.environ.get('POLYGON_API_KEY'), help='Polygon API key (default: $POLYGON_API_KEY)')
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error('An API key is required: pass --api-key or set POLYGON_API_KEY')
+
+    started = time.perf_counter()
+    loaded = load_market_range(PolygonClient(args.api_key), args.from_date, args.to_date, args.workers)
+    print(f"Loaded {sum(loaded.values()):,} bars for {len(loaded)} date(s) in {time.perf_counter() - started:,.1f}s", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+import collections
+import logging
+import pickle
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+from ohlcv import OHLCVBars
+from singleflight import SingleFlight
+from config.cache_config import CACHE_MAX_BYTES
+
+# Initialize the logger (configured by the application, if at all)
+logger = logging.getLogger(f'polygon.{__name__}')
+
+# Approximate bytes held by a cached value
+def value_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, (np.ndarray, OHLCVBars)):
+        return int(value.nbytes)
+    # Lists and dicts of JSON results are small; their pickled size is a fair estimate
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+# Hashable form of a call argument, so dict and list arguments can be part of a cache key
+def hashable_arg(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, hashable_arg(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(hashable_arg(item) for item in value)
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return pickle.dumps(value)
+
+# Cache key of a call, with defaults applied so equivalent calls share an entry
+def call_key(func, signature, args, kwargs):
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return (func.__module__, func.__qualname__, hashable_arg(bound.arguments))
+
+# In-process cache bounded by the bytes its values hold rather than by their number.
+# Least recently used entries are evicted once the budget is exceeded. Entries with a staleness allowance
+# are served for up to max_stale seconds past their ttl while a background thread refreshes them.
+class MemoryCache:
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()  # Least recently used first
+        self._bytes = 0
+        self._endpoints = collections.defaultdict(lambda: {
+            'bytes': 0, 'entries': 0, 'hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0, 'refreshes': 0, 'refresh_errors': 0,
+        })
+        self._in_flight = SingleFlight()  # One computation per key at a time
+        self._refreshing = set()  # Keys being refreshed in the background
+
+    # Drop an entry and its byte accounting (lock held by the caller)
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry['size']
+        counters = self._endpoints[entry['endpoint']]
+        counters['bytes'] -= entry['size']
+        counters['entries'] -= 1
+        return entry
+
+    # Live entry of a key, dropping it once it is past its staleness bound (lock held by the caller)
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry['expires_at'] is not None and entry['expires_at'] <= time.monotonic():
+            self._remove(key)
+            return None
+        return entry
+
+    # Value of a key as (found, value, stale), refreshing its recency
+    def get(self, key, endpoint):
+        with self._lock:
+            entry = self._lookup(key)
+            counters = self._endpoints[endpoint]
+            if entry is None:
+                counters['misses'] += 1
+                return False, None, False
+            self._entries.move_to_end(key)
+            stale = entry['stale_at'] is not None and entry['stale_at'] <= time.monotonic()
+            counters['stale_hits' if stale else 'hits'] += 1
+            return True, entry['value'], stale
+
+    # Store a value that is fresh for ttl seconds (None keeps it until evicted) and may then be served stale
+    # for max_stale more seconds, evicting the least recently used entries to fit
+    # Store a value. size is measured here unless given, e.g. when it was measured before the value was frozen.
+    def put(self, key, endpoint, value, ttl=None, max_stale=None, size=None):
+        size = value_size(value) if size is None else size
+        if size > self.max_bytes:
+            logger.warning(f"Not caching a {size:,} byte {endpoint} value: it exceeds the {self.max_bytes:,} byte cache budget")
+            return
+        stale_at = time.monotonic() + ttl if ttl is not None else None
+        expires_at = stale_at + max_stale if stale_at is not None and max_stale else stale_at
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {'endpoint': endpoint, 'value': value, 'size': size, 'stale_at': stale_at, 'expires_at': expires_at}
+            self._bytes += size
+            counters = self._endpoints[endpoint]
+            counters['bytes'] += size
+            counters['entries'] += 1
+            while self._bytes > self.max_bytes:
+                evicted = self._remove(next(iter(self._entries)))
+                self._endpoints[evicted['endpoint']]['evictions'] += 1
+                logger.info(f"Evicted a {evicted['size']:,} byte {evicted['endpoint']} entry from the cache ({self._bytes:,} of {self.max_bytes:,} bytes used)")
+
+    # Cached value of a key, computing and storing it on a miss; concurrent misses of one key compute it once.
+    # A stale value is returned immediately and recomputed with refresh (default: compute) on a background thread.
+    # freeze, if given, turns a computed value into the one stored, after its size has been measured.
+    def get_or_compute(self, key, endpoint, ttl, compute, max_stale=None, refresh=None, freeze=None):
+        found, value, stale = self.get(key, endpoint)
+        if found:
+            if stale:
+                self._refresh_in_background(key, endpoint, ttl, refresh or compute, max_stale, freeze)
+            return value
+        return self._in_flight.do(key, self._compute, key, endpoint, ttl, compute, max_stale, freeze)
+
+    def _compute(self, key, endpoint, ttl, compute, max_stale, freeze):
+        # Another caller may have stored the value between the lookup and this computation
+        with self._lock:
+            entry = self._lookup(key)
+        if entry is not None:
+            return entry['value']
+        return self._put_computed(key, endpoint, compute(), ttl, max_stale, freeze)
+
+    # Measure a computed value, freeze it if asked and store it, returning the stored value
+    def _put_computed(self, key, endpoint, value, ttl, max_stale, freeze):
+        size = value_size(value)
+        if freeze is not None:
+            value = freeze(value)
+        self.put(key, endpoint, value, ttl, max_stale, size)
+        return value
+
+    # Recompute a stale entry on a daemon thread, at most once per key at a time
+    def _refresh_in_background(self, key, endpoint, ttl, compute, max_stale, freeze):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(target=self._refresh, args=(key, endpoint, ttl, compute, max_stale, freeze), daemon=True).start()
+
+    def _refresh(self, key, endpoint, ttl, compute, max_stale, freeze):
+        try:
+            self._put_computed(key, endpoint, compute(), ttl, max_stale, freeze)
+            outcome = 'refreshes'
+        except Exception as e:
+            # Keep serving the stale value until its staleness bound; the next stale hit retries
+            logger.warning(f"Background refresh of a {endpoint} entry failed: {e}")
+            outcome = 'refresh_errors'
+        with self._lock:
+            self._refreshing.discard(key)
+            self._endpoints[endpoint][outcome] += 1
+
+    # Drop every entry
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    # Bytes held against the budget, with hits, misses, evictions, refreshes and bytes held by each endpoint
+    def stats(self):
+        with self._lock:
+            return {
+                'max_bytes': self.max_bytes,
+                'bytes': self._bytes,
+                'entries': len(self._entries),
+                'endpoints': {endpoint: dict(counters) for endpoint, counters in self._endpoints.items()},
+            }
+
+# Process-wide cache shared by every session
+_cache = None
+_cache_lock = threading.Lock()
+
+# Get the shared memory cache
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = MemoryCache()
+    return _cache
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+from config.cache_config import MARKET_TIMEZONE
+
+# Fields of an aggregate bar as returned by Polygon, in storage order
+OHLCV_FIELDS = ('t', 'o', 'h', 'l', 'c', 'v', 'vw', 'n')
+
+# Fields holding prices, stored in the price dtype of the series
+PRICE_FIELDS = ('o', 'h', 'l', 'c', 'vw')
+
+# Column names of the DataFrame returned by to_pandas
+PANDAS_COLUMNS = {'o': 'Open', 'h': 'High', 'l': 'Low', 'c': 'Close', 'v': 'Volume', 'vw': 'VWAP', 'n': 'Transactions'}
+
+# Dtype of each field other than prices: epoch nanoseconds, whole shares and trade counts
+FIELD_DTYPES = {'t': np.int64, 'v': np.uint64, 'n': np.uint64}
+
+# Bars as one contiguous numpy array per field instead of a DataFrame of per-row values. t is epoch nanoseconds (UTC),
+# prices are float64 or float32 with missing values as NaN, v and n are uint64 with missing values as 0.
+class OHLCVBars:
+    def __init__(self, t, o, h, l, c, v, vw=None, n=None, price_dtype=np.float64):
+        price_dtype = np.dtype(price_dtype)
+        if price_dtype not in (np.dtype(np.float64), np.dtype(np.float32)):
+            raise ValueError(f"Prices must be float64 or float32, got {price_dtype}")
+        self.t = np.ascontiguousarray(t, dtype=np.int64)
+        size = len(self.t)
+        fields = {'o': o, 'h': h, 'l': l, 'c': c, 'v': v, 'vw': vw, 'n': n}
+        for name, values in fields.items():
+            dtype = FIELD_DTYPES.get(name, price_dtype)
+            if values is None:
+                values = np.full(size, np.nan if name in PRICE_FIELDS else 0, dtype=dtype)
+            values = np.asarray(values)
+            if values.dtype.kind == 'f' and np.dtype(dtype).kind == 'u':
+                values = np.rint(np.nan_to_num(values))  # Fractional volumes, e.g. after a reverse split, become whole shares
+            values = np.ascontiguousarray(values, dtype=dtype)
+            if len(values) != size:
+                raise ValueError(f"Field '{name}' has {len(values)} values for {size} timestamps")
+            setattr(self, name, values)
+
+    # Build bars from Polygon results (a list of dicts with 't' in epoch milliseconds) without an intermediate DataFrame
+    @classmethod
+    def from_records(cls, results, price_dtype=np.float64):
+        columns = {}
+        for name in OHLCV_FIELDS:
+            missing = np.nan if name in PRICE_FIELDS else 0
+            columns[name] = np.fromiter((bar.get(name, missing) for bar in results), dtype=np.float64 if name != 't' else np.int64, count=len(results))
+        columns['t'] *= 1_000_000
+        return cls(**columns, price_dtype=price_dtype)
+
+    # Build bars from a raw bar frame (t in epoch milliseconds, o, h, l, c, v and optionally vw, n)
+    @classmethod
+    def from_frame(cls, bars, price_dtype=np.float64):
+        if bars.empty:
+            return cls.empty_series(price_dtype)
+        columns = {name: bars[name].to_numpy(dtype=np.float64, na_value=np.nan) for name in OHLCV_FIELDS[1:] if name in bars}
+        columns['t'] = bars['t'].to_numpy(dtype=np.int64) * 1_000_000
+        return cls(**columns, price_dtype=price_dtype)
+
+    # Series without any bar
+    @classmethod
+    def empty_series(cls, price_dtype=np.float64):
+        return cls(np.empty(0, dtype=np.int64), *[np.empty(0)] * 5, price_dtype=price_dtype)
+
+    # Concatenate series into one, keeping the last bar of any duplicated timestamp and sorting by time
+    @classmethod
+    def concat(cls, parts):
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty_series()
+        price_dtype = np.result_type(*[part.price_dtype for part in parts])
+        columns = {name: np.concatenate([getattr(part, name) for part in parts]) for name in OHLCV_FIELDS}
+        # Keep the last occurrence of each timestamp, as fetch_windows does for overlapping windows
+        _, last = np.unique(columns['t'][::-1], return_index=True)
+        order = len(columns['t']) - 1 - last
+        return cls(**{name: values[order] for name, values in columns.items()}, price_dtype=price_dtype)
+
+    def __len__(self):
+        return len(self.t)
+
+    # Bars selected by a slice, boolean mask or integer indices
+    def __getitem__(self, key):
+        return type(self)(**{name: getattr(self, name)[key] for name in OHLCV_FIELDS}, price_dtype=self.price_dtype)
+
+    def __repr__(self):
+        return f"OHLCVBars({len(self)} bars, {self.price_dtype} prices, {self.nbytes:,} bytes)"
+
+    @property
+    def price_dtype(self):
+        return self.c.dtype
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    # Bytes held by the arrays of the series
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in OHLCV_FIELDS)
+
+    # Timestamps in epoch milliseconds, as used by raw bar frames and the bar store
+    def t_ms(self):
+        return self.t // 1_000_000
+
+    # Copy with new arrays for some fields, e.g. adjusted prices
+    def replace(self, **fields):
+        columns = {name: fields.get(name, getattr(self, name)) for name in OHLCV_FIELDS}
+        return type(self)(**columns, price_dtype=self.price_dtype)
+
+    # Make every array read-only, so a series shared through the cache cannot be changed in place
+    def freeze(self):
+        for name in OHLCV_FIELDS:
+            getattr(self, name).flags.writeable = False
+        return self
+
+    # Raw bar frame (t in epoch milliseconds, o, h, l, c, v, vw, n) for code that works on Polygon-shaped frames
+    def to_frame(self):
+        columns = {name: getattr(self, name) for name in OHLCV_FIELDS}
+        columns['t'] = self.t_ms()
+        return pd.DataFrame(columns, copy=False)
+
+    # DataFrame with Open/High/Low/Close/Volume/VWAP/Transactions columns on a 'Date' index. The columns share memory
+    # with the arrays. A market-time index needs one copy of the timestamps; tz=None gives a naive UTC index without one.
+    def to_pandas(self, tz=MARKET_TIMEZONE):
+        dates = pd.DatetimeIndex(self.t.view('datetime64[ns]'), copy=False, name='Date')
+        if tz is not None:
+            dates = dates.tz_localize('UTC').tz_convert(tz)
+        columns = {label: getattr(self, name) for name, label in PANDAS_COLUMNS.items()}
+        return pd.DataFrame(columns, index=dates, copy=False)
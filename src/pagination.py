@@ -0,0 +1,81 @@
+import logging
+import queue
+import threading
+import http_client
+from config.api_config import PAGE_PREFETCH
+
+# Initialize the logger (configured by the application, if at all)
+logger = logging.getLogger(f'polygon.{__name__}')
+
+# Marker put on the page queue once the last page has been fetched
+_DONE = object()
+
+# Add the API key to a next_url cursor, which Polygon returns without it
+def _with_api_key(url, api_key):
+    if api_key is None or 'apiKey=' in url:
+        return url
+    separator = '&' if '?' in url else '?'
+    return f"{url}{separator}apiKey={api_key}"
+
+# Yield the 'results' list of every page, following next_url cursors
+def iter_pages(url, api_key=None, max_results=None, prefetch=PAGE_PREFETCH):
+    # Pages are fetched on a background thread and buffered in a bounded queue,
+    # so the caller can process one page while at most `prefetch` more are held in memory.
+    pages = queue.Queue(maxsize=max(prefetch, 1))
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        next_url = url
+        fetched = 0
+        page_count = 0
+        try:
+            while next_url and not stop.is_set():
+                response = http_client.get(_with_api_key(next_url, api_key))
+                if response.status_code != 200:
+                    raise http_client.PolygonAPIError(response.status_code, response.text)
+                payload = response.json()
+                results = payload.get('results', [])
+                page_count += 1
+                fetched += len(results)
+                if not put(results):
+                    return
+                if max_results is not None and fetched >= max_results:
+                    break
+                next_url = payload.get('next_url')
+            logger.info(f"Finished paginating {page_count} page(s) with {fetched} result(s)")
+        except Exception as e:
+            put(e)
+        finally:
+            put(_DONE)
+
+    producer = threading.Thread(target=produce, name='polygon-paginator', daemon=True)
+    producer.start()
+
+    remaining = max_results
+    try:
+        while True:
+            item = pages.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            # Trim the last page so no more than max_results are returned
+            if remaining is not None:
+                item = item[:remaining]
+                remaining -= len(item)
+            if item:
+                yield item
+            if remaining == 0:
+                return
+    finally:
+        # Stop the producer if the caller stopped iterating early
+        stop.set()
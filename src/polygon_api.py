@@ -2,196 +2,133 @@ import streamlit as st
 import requests
 import pandas as pd
 import config.log_config
+import market_calendar
+from http_client import PolygonAPIError
+from polygon_client import PolygonClient
+from cache_policy import cached, split_by_session
+from split_adjust import adjust_ohlcv_frame
+from config.api_config import CHUNK_WORKERS
+from config.cache_config import BAR_STORE_TIMESPANS
 
-# Read the API_KEY from secrets
-API_KEY = st.secrets['API_KEY']
+# Streamlit adapter over the core PolygonClient: reads the API key from st.secrets, caches results and shows spinners
 
 # Initialize the logger
 logger = config.log_config.setup_logging()
 
-# Apply comma formatting to the entire DataFrame
-def format_with_comma(df):
-    for col in df.select_dtypes(include=['float', 'int']).columns:
-        df[col] = df[col].apply(lambda x: f"{x:,.2f}")
-    return df
-
-# Get historical stock data from Polygon API
-@st.cache_data(ttl=1800, max_entries=100, show_spinner='Fetching data from API...')
-def get_historical_data_as_df(ticker, from_date, to_date, adjusted, timespan, api_key):
-    adjusted_param = 'true' if adjusted else 'false'
-    url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/1/{timespan}/{from_date}/{to_date}?adjusted={adjusted_param}&apiKey={api_key}"
-    logger.info(f"Requesting historical data for {ticker} from {from_date} to {to_date} with adjusted={adjusted_param} and timespan={timespan}") # Log the request
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json().get('results', [])
-        if data:
-            df = pd.DataFrame(data)
-            df['t'] = pd.to_datetime(df['t'], unit='ms').dt.date
-            df.rename(columns={'t': 'Date', 'o': 'Open', 'h': 'High', 'l': 'Low', 'c': 'Close', 'v': 'Volume'}, inplace=True)
-            df = df[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
-            df = format_with_comma(df)  # Apply comma formatting
-            return df
-        else:
-            logger.warning(f"No data found for {ticker} from {from_date} to {to_date}")
-            return pd.DataFrame()  # Return empty dataframe if no data found
-    else:
-        logger.error(f"API request failed for {ticker} with status code {response.status_code}: {response.text}")
-        raise Exception(f"API request failed with status code {response.status_code}: {response.text}")
-
-
-# Get financials data from Polygon API
-@st.cache_data(ttl=1800, max_entries=100, show_spinner='Fetching data from API...')
-def get_financials_as_df(ticker, limit, api_key, timeframe=None):
-    url = f"https://api.polygon.io/vX/reference/financials?ticker={ticker}&limit={limit}&apiKey={api_key}"
-    if timeframe:
-        url += f"&timeframe={timeframe}"
-    logger.info(f"Requesting financials data for {ticker} with limit {limit} and timeframe {timeframe}")
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()['results']
-        logger.info(f"Successfully retrieved financials data for {ticker}. Number of records: {len(data)}")
-        return data
-    else:
-        logger.error(f"Failed to retrieve financials data for {ticker}. Status code: {response.status_code}, Response: {response.text}")
-        return []
-
-
-# Create a dataframe from the financials data
-@st.cache_data(ttl=1800, max_entries=100, show_spinner=True)
-def create_financials_dataframe(data):
-    logger.info(f"Starting to create dataframe from financials data. Number of records: {len(data)}")
-    records = []
-
-    for item in data:
-        record = {
-            "CIK": item.get("cik"),
-            "Company Name": item.get("company_name"),
-            "Fiscal Year": item.get("fiscal_year"),
-            "Fiscal Period": item.get("fiscal_period"),
-            "Start Date": item.get("start_date"),
-            "End Date": item.get("end_date"),
-            "Filing Date": item.get("filing_date"),
-        }
-        
-        financials = item.get('financials', {})
-        for section, section_data in financials.items():
-            for key, value in section_data.items():
-                label = value.get("label")
-                if label:
-                    record[label] = value.get("value")
-
-        # Free Cash Flow calculation
-        net_cash_flow_op = record.get("Net Cash Flow From Operating Activities", 0)
-        net_cash_flow_inv = record.get("Net Cash Flow From Investing Activities", 0)
-        record["Free Cash Flow"] = net_cash_flow_op + net_cash_flow_inv
-        
-        records.append(record)
-
-    if records:
-        logger.info("Successfully created records for dataframe.")
-    else:
-        logger.warning("No records were created for the dataframe.")
-
-    df = pd.DataFrame(records)
-    df = format_with_comma(df)  # Apply comma formatting for entire DataFrame
-    columns_order = [
-        "CIK", "Company Name", "Fiscal Year", "Fiscal Period", "Start Date", "End Date", "Filing Date",
-        "Revenues", "Gross Profit", "Operating Income/Loss", "Income/Loss From Continuing Operations Before Tax",
-        "Net Income/Loss", "Basic Earnings Per Share", "Diluted Earnings Per Share", "Assets",
-        "Current Assets", "Noncurrent Assets", "Liabilities", "Current Liabilities", "Noncurrent Liabilities",
-        "Equity", "Net Cash Flow From Operating Activities", "Net Cash Flow From Investing Activities", 
-        "Net Cash Flow From Financing Activities", "Free Cash Flow"
-    ]
-    df = df[[col for col in columns_order if col in df.columns]]
-
-    logger.info(f"Dataframe creation completed. Number of rows: {df.shape[0]}")
-    return df
+# Read the API_KEY from secrets on first use, so importing this module does not need a secrets file
+def get_api_key():
+    return st.secrets['API_KEY']
+
+# Keep polygon_api.API_KEY working for callers that read it as a module attribute
+def __getattr__(name):
+    if name == 'API_KEY':
+        return get_api_key()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Core client for an API key, adjusting bars with the cached split history
+def get_client(api_key=None, workers=CHUNK_WORKERS):
+    api_key = api_key or get_api_key()
+    return PolygonClient(api_key, workers=workers, split_history=lambda ticker: get_split_history(ticker, api_key))
+
+# Get unadjusted historical data of closed sessions, which never changes
+@cached('historical_closed')
+def get_closed_historical_data_as_df(ticker, from_date, to_date, timespan, api_key, workers=CHUNK_WORKERS, derive_from_minute=False):
+    return get_client(api_key, workers).get_historical_bars(ticker, from_date, to_date, False, timespan, derive_from_minute=derive_from_minute)
+
+# Get split-adjusted historical data of closed sessions, for timespans too coarse to adjust after caching
+# (a week or month bar can straddle a split), kept only as long as the split history
+@cached('historical_closed_adjusted')
+def get_closed_adjusted_historical_data_as_df(ticker, from_date, to_date, timespan, api_key, workers=CHUNK_WORKERS, derive_from_minute=False):
+    return get_client(api_key, workers).get_historical_bars(ticker, from_date, to_date, True, timespan, derive_from_minute=derive_from_minute)
+
+# Get historical data that includes the current session
+@cached('historical_live')
+def get_live_historical_data_as_df(ticker, from_date, to_date, adjusted, timespan, api_key, workers=CHUNK_WORKERS, derive_from_minute=False):
+    return get_client(api_key, workers).get_historical_bars(ticker, from_date, to_date, adjusted, timespan, derive_from_minute=derive_from_minute)
+
+# Get closed-session bars. Bars of stored timespans are cached unadjusted and split-adjusted on every call
+# with the current split history, so a split executed after caching is applied without refetching.
+def get_closed_bars(ticker, from_date, to_date, adjusted, timespan, api_key, workers=CHUNK_WORKERS, derive_from_minute=False):
+    if adjusted and timespan not in BAR_STORE_TIMESPANS:
+        return get_closed_adjusted_historical_data_as_df(ticker, from_date, to_date, timespan, api_key, workers, derive_from_minute)
+    df = get_closed_historical_data_as_df(ticker, from_date, to_date, timespan, api_key, workers, derive_from_minute)
+    return adjust_ohlcv_frame(df, get_split_history(ticker, api_key)) if adjusted else df
+
+# Refresh the market calendar with the closures Polygon announces, at most once a day
+@cached('market_calendar', show_spinner=False)
+def refresh_market_calendar(api_key):
+    return market_calendar.refresh_calendar(PolygonClient(api_key))
+
+# Get historical stock data from Polygon API, caching closed and current sessions separately.
+# With derive_from_minute, hour and coarser bars are resampled from stored minute bars instead of refetched.
+def get_historical_data_as_df(ticker, from_date, to_date, adjusted, timespan, api_key, workers=CHUNK_WORKERS, derive_from_minute=False):
+    # The rules alone still cover the regular holidays when the refresh fails
+    try:
+        refresh_market_calendar(api_key)
+    except (PolygonAPIError, requests.RequestException, OSError) as e:
+        logger.error(f"Failed to refresh the market calendar: {e}")
+    closed_range, live_range = split_by_session(from_date, to_date, timespan)
+    frames = []
+    if closed_range:
+        frames.append(get_closed_bars(ticker, *closed_range, adjusted, timespan, api_key, workers, derive_from_minute))
+    if live_range:
+        frames.append(get_live_historical_data_as_df(ticker, *live_range, adjusted, timespan, api_key, workers, derive_from_minute))
+    frames = [frame for frame in frames if not frame.empty]
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames) if frames else pd.DataFrame()
+
+# Day-level view of bars with a plain date index, derived only when a caller needs it
+def date_view(df):
+    if df.empty:
+        return df
+    return df.set_axis(df.index.tz_localize(None).normalize().rename('Date'))
+
+
+# Fetch financials and flatten them in one cached call, so the cache is keyed by the request
+# rather than by hashing the raw filings (raises on failure so errors are never cached)
+@cached('financials')
+def fetch_financials_dataframe(ticker, limit, api_key, timeframe=None):
+    return get_client(api_key).get_financials_dataframe(ticker, limit, timeframe)
+
+# Get the financials dataframe, returning an empty dataframe if the request failed
+def get_financials_dataframe(ticker, limit, api_key, timeframe=None):
+    try:
+        return fetch_financials_dataframe(ticker, limit, api_key, timeframe)
+    except (PolygonAPIError, requests.RequestException) as e:
+        logger.error(f"Failed to retrieve financials data for {ticker}: {e}")
+        return pd.DataFrame()
 
 # Get company details from Polygon API
-@st.cache_data(ttl=1800, max_entries=100, show_spinner='Fetching data from API...')
+@cached('details')
 def get_company_details(ticker, api_key):
-    logger.info(f"Requesting company details for ticker: {ticker}")
-    url = f"https://api.polygon.io/v3/reference/tickers/{ticker}?apiKey={api_key}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json().get('results', {})
-        if data:
-            logger.info(f"Successfully retrieved company details for {ticker}.")
-        else:
-            logger.warning(f"Company details for {ticker} were found, but no data was returned.")
-        # Convert the data to a dataframe
-        details_df = pd.DataFrame([data])
-        return details_df.transpose()
-    else:
-        logger.error(f"Failed to retrieve company details for {ticker}: HTTP {response.status_code}")
-        raise Exception(f"Failed to retrieve company details: {response.status_code}")
-    
+    return get_client(api_key).get_company_details(ticker)
+
 # Get stock splits data from Polygon API
-@st.cache_data(ttl=1800, max_entries=100, show_spinner='Fetching data from API...')
+@cached('splits')
 def get_stock_splits(ticker=None, limit=50, **date_filters):
-    logger.info(f"Requesting stock splits data for ticker: {ticker if ticker else 'All Tickers'} with limit: {limit}")
-    # Base URL
-    base_url = f'https://api.polygon.io/v3/reference/splits?limit={limit}&apiKey={API_KEY}'
-    
-    # Add ticker to the URL if provided
-    if ticker:
-        base_url += f'&ticker={ticker}'
-    
-    # Add date filters to the URL
-    for key, value in date_filters.items():
-        if value:  # Only add the filter if the value is not None
-            base_url += f'&execution_date.{key}={value}'
-
-    response = requests.get(base_url)
-    if response.status_code == 200:
-        data = response.json().get('results', [])
-        if data:
-            logger.info(f"Successfully retrieved stock splits data for {ticker if ticker else 'All Tickers'}.")
-            df = pd.DataFrame(data)[['ticker', 'execution_date', 'split_from', 'split_to']]
-            df.columns = ['Ticker', 'Execution Date', 'Split From', 'Split To']
-            df['Adjustment Factor'] = df['Split From'] / df['Split To']
-            df['Adjustment Factor'] = df['Adjustment Factor'].apply(lambda x: f"{x:.10f}")
-            return df
-        else:
-            logger.warning(f"Stock splits data for {ticker if ticker else 'All Tickers'} was found, but no data was returned.")
-            return pd.DataFrame(columns=['Ticker', 'Execution Date', 'Split From', 'Split To', 'Adjustment Factor'])
-    else:
-        logger.error(f"Failed to retrieve stock splits data for {ticker if ticker else 'All Tickers'}: HTTP {response.status_code}")
-        raise Exception(f"API request failed with status code {response.status_code}: {response.text}")
+    return get_client().get_stock_splits(ticker, limit, **date_filters)
+
+# Get every split of a ticker for adjusting its bars locally
+@cached('split_history', show_spinner=False)
+def get_split_history(ticker, api_key):
+    return PolygonClient(api_key).get_split_history(ticker)
 
 # Get dividends data from Polygon API
-@st.cache_data(ttl=1800, max_entries=100, show_spinner='Fetching data from API...')
+@cached('dividends')
 def get_dividends_data(ticker, limit, api_key):
-    logger.info(f"Requesting dividends data for ticker: {ticker} with limit: {limit}")
-    url = f"https://api.polygon.io/v3/reference/dividends?ticker={ticker}&limit={limit}&apiKey={api_key}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json().get('results', [])
-        if data:
-            logger.info(f"Successfully retrieved dividends data for {ticker}.")
-            return data
-        else:
-            logger.warning(f"Dividends data for {ticker} was found, but no data was returned.")
-            return []
-    else:
-        logger.error(f"Failed to retrieve dividends data for {ticker}: HTTP {response.status_code}")
-        raise Exception(f"API request failed with status code {response.status_code}: {response.text}")
-    
-
-# Get news from Polygon API 
-@st.cache_data(ttl=1800, max_entries=100, show_spinner='Fetching data from API...')
-def get_news(ticker=None, limit=5, api_key=API_KEY):
-    # Use the ticker-specific news URL if ticker is provided
-    if ticker:
-        url = f"https://api.polygon.io/v2/reference/news?ticker={ticker}&limit={limit}&apiKey={api_key}"
-    else:
-        # Use the general news URL if no ticker is provided
-        url = f"https://api.polygon.io/v2/reference/news?limit={limit}&apiKey={api_key}"
-    
-    response = requests.get(url)
-    if response.status_code == 200:
-        news_data = response.json().get('results', [])
-        return news_data
-    else:
-        logger.error(f"Failed to retrieve news: {response.status_code}")
+    return get_client(api_key).get_dividends(ticker, limit)
+
+
+# Get news from Polygon API (raises on failure so errors are never cached)
+@cached('news')
+def fetch_news(ticker=None, limit=5, api_key=None):
+    return get_client(api_key).get_news(ticker, limit)
+
+# Get news, returning an empty list if the request failed
+def get_news(ticker=None, limit=5, api_key=None):
+    try:
+        return fetch_news(ticker, limit, api_key or get_api_key())
+    except (PolygonAPIError, requests.RequestException) as e:
+        logger.error(f"Failed to retrieve news: {e}")
         return []
@@ -0,0 +1,257 @@
+import logging
+import numpy as np
+import pandas as pd
+import http_client
+from http_client import PolygonAPIError
+from pagination import iter_pages
+from range_planner import plan_windows, fetch_windows
+import bar_store
+from resample import resample_bars, RESAMPLE_TIMESPANS
+from split_adjust import adjust_for_splits
+from financials import flatten_financials
+from ohlcv import OHLCVBars
+from config.cache_config import BAR_STORE_TIMESPANS, MARKET_TIMEZONE
+from config.api_config import POLYGON_BASE_URL, AGGS_PAGE_LIMIT, REFERENCE_PAGE_LIMIT, CHUNK_WORKERS
+
+# Initialize the logger (configured by the application, if at all)
+logger = logging.getLogger(f'polygon.{__name__}')
+
+# Polygon client without any Streamlit dependency. Every setting is passed in explicitly, so it can run
+# in a CLI, a worker process or a benchmark. store is the bar store to use (the shared one by default) and
+# split_history an optional function returning the splits of a ticker, e.g. a cached one.
+class PolygonClient:
+    def __init__(self, api_key, base_url=POLYGON_BASE_URL, workers=CHUNK_WORKERS, store=None, split_history=None):
+        if not api_key:
+            raise ValueError("A Polygon API key is required")
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.workers = workers
+        self._store = store
+        self.split_history = split_history or self.get_split_history
+
+    # Bar store holding closed sessions
+    def store(self):
+        return self._store if self._store is not None else bar_store.get_store()
+
+    # Fetch the raw aggregate bars of one date window, following pagination
+    def fetch_aggregate_bars(self, ticker, from_date, to_date, adjusted, timespan):
+        adjusted_param = 'true' if adjusted else 'false'
+        url = f"{self.base_url}/v2/aggs/ticker/{ticker}/range/1/{timespan}/{from_date}/{to_date}?adjusted={adjusted_param}&sort=asc&limit={AGGS_PAGE_LIMIT}&apiKey={self.api_key}"
+        # Build a small frame per page as it arrives instead of holding every raw page
+        frames = [pd.DataFrame(page) for page in iter_pages(url, self.api_key)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    # Fetch the raw bars of a date range, splitting large minute/hour ranges into concurrent windows
+    def fetch_aggregate_range(self, ticker, from_date, to_date, adjusted, timespan, workers=None):
+        windows = plan_windows(from_date, to_date, timespan)
+        return fetch_windows(windows, lambda start, end: self.fetch_aggregate_bars(ticker, start, end, adjusted, timespan), workers or self.workers)
+
+    # Load the unadjusted bars of a date range, reading closed sessions from the bar store and fetching only the missing sub-ranges
+    def load_raw_bars(self, ticker, from_date, to_date, timespan, workers=None):
+        workers = workers or self.workers
+        # Only sessions before today are final; today's bars are always fetched and never stored
+        last_closed_date = bar_store.last_closed_date()
+        store = self.store()
+        frames = []
+        if from_date <= last_closed_date:
+            closed_to_date = min(to_date, last_closed_date)
+            # Fetch every gap between the spans already held in one pool of windows
+            missing = store.missing_ranges(ticker, timespan, False, from_date, closed_to_date)
+            if missing:
+                windows = [window for start, end in missing for window in plan_windows(start, end, timespan)]
+                fetched = fetch_windows(windows, lambda start, end: self.fetch_aggregate_bars(ticker, start, end, False, timespan), workers)
+                store.write(ticker, timespan, False, fetched, missing)
+            # Stored and newly fetched bars come back as a single sorted series
+            frames.append(store.read(ticker, timespan, False, from_date, closed_to_date))
+        if to_date > last_closed_date:
+            frames.append(self.fetch_aggregate_range(ticker, max(from_date, bar_store.shift_date(last_closed_date, 1)), to_date, False, timespan, workers))
+
+        frames = [frame for frame in frames if not frame.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    # Load the bars of a date range. Stored timespans are kept unadjusted and split-adjusted locally,
+    # so toggling 'adjusted' needs no second dataset.
+    def load_aggregate_bars(self, ticker, from_date, to_date, adjusted, timespan, workers=None):
+        if timespan not in BAR_STORE_TIMESPANS:
+            return self.fetch_aggregate_range(ticker, from_date, to_date, adjusted, timespan, workers)
+        bars = self.load_raw_bars(ticker, from_date, to_date, timespan, workers)
+        if adjusted and not bars.empty:
+            bars = adjust_for_splits(bars, self.split_history(ticker))
+        return bars
+
+    # Whether the closed part of a range is held as minute bars in the bar store
+    def has_stored_minute_bars(self, ticker, from_date, to_date):
+        closed_to_date = min(to_date, bar_store.last_closed_date())
+        return from_date <= closed_to_date and self.store().covers(ticker, 'minute', False, from_date, closed_to_date)
+
+    # Historical bars of a date range with Open/High/Low/Close/Volume columns on a market-time 'Date' index.
+    # With derive_from_minute, hour and coarser bars are resampled from stored minute bars instead of refetched.
+    def get_historical_bars(self, ticker, from_date, to_date, adjusted=True, timespan='day', workers=None, derive_from_minute=False):
+        adjusted_param = 'true' if adjusted else 'false'
+        logger.info(f"Requesting historical data for {ticker} from {from_date} to {to_date} with adjusted={adjusted_param} and timespan={timespan}") # Log the request
+        try:
+            # Compute coarser bars locally when the minute bars of the range are already stored
+            if derive_from_minute and timespan in RESAMPLE_TIMESPANS and self.has_stored_minute_bars(ticker, from_date, to_date):
+                logger.info(f"Deriving {timespan} bars for {ticker} from stored minute bars")
+                df = resample_bars(self.load_aggregate_bars(ticker, from_date, to_date, adjusted, 'minute', workers), timespan)
+            else:
+                df = self.load_aggregate_bars(ticker, from_date, to_date, adjusted, timespan, workers)
+        except PolygonAPIError as e:
+            logger.error(f"API request failed for {ticker} with status code {e.status_code}: {e.text}")
+            raise
+        if not df.empty:
+            # Convert epoch milliseconds to market time in one vectorized step, keeping intraday timestamps
+            dates = pd.to_datetime(df['t'].to_numpy(), unit='ms', utc=True).tz_convert(MARKET_TIMEZONE).rename('Date')
+            df = df.rename(columns={'o': 'Open', 'h': 'High', 'l': 'Low', 'c': 'Close', 'v': 'Volume'}).set_axis(dates)
+            df = df[['Open', 'High', 'Low', 'Close', 'Volume']]
+            return df
+        else:
+            logger.warning(f"No data found for {ticker} from {from_date} to {to_date}")
+            return pd.DataFrame()  # Return empty dataframe if no data found
+
+    # Bars of a date range as OHLCVBars, like load_aggregate_bars but adjusted on the arrays of the series
+    def load_ohlcv(self, ticker, from_date, to_date, adjusted, timespan, workers=None, price_dtype=np.float64):
+        if timespan not in BAR_STORE_TIMESPANS:
+            return OHLCVBars.from_frame(self.fetch_aggregate_range(ticker, from_date, to_date, adjusted, timespan, workers), price_dtype)
+        bars = OHLCVBars.from_frame(self.load_raw_bars(ticker, from_date, to_date, timespan, workers), price_dtype)
+        if adjusted and not bars.empty:
+            bars = adjust_for_splits(bars, self.split_history(ticker))
+        return bars
+
+    # Historical bars of a date range as compact OHLCVBars (float32 prices with price_dtype=np.float32).
+    # Call .to_pandas() for the DataFrame form; derive_from_minute works as in get_historical_bars.
+    def get_historical_ohlcv(self, ticker, from_date, to_date, adjusted=True, timespan='day', workers=None, derive_from_minute=False, price_dtype=np.float64):
+        logger.info(f"Requesting historical bars for {ticker} from {from_date} to {to_date} with adjusted={adjusted} and timespan={timespan}")
+        if derive_from_minute and timespan in RESAMPLE_TIMESPANS and self.has_stored_minute_bars(ticker, from_date, to_date):
+            logger.info(f"Deriving {timespan} bars for {ticker} from stored minute bars")
+            return resample_bars(self.load_ohlcv(ticker, from_date, to_date, adjusted, 'minute', workers, price_dtype), timespan)
+        bars = self.load_ohlcv(ticker, from_date, to_date, adjusted, timespan, workers, price_dtype)
+        if bars.empty:
+            logger.warning(f"No data found for {ticker} from {from_date} to {to_date}")
+        return bars
+
+    # Daily bars of every US stock for one date in a single request, with the ticker in a 'ticker' column
+    def fetch_grouped_daily(self, date, adjusted=False):
+        adjusted_param = 'true' if adjusted else 'false'
+        url = f"{self.base_url}/v2/aggs/grouped/locale/us/market/stocks/{date}?adjusted={adjusted_param}&apiKey={self.api_key}"
+        response = http_client.get(url)
+        if response.status_code != 200:
+            raise PolygonAPIError(response.status_code, response.text)
+        bars = pd.DataFrame(response.json().get('results') or [])
+        return bars.rename(columns={'T': 'ticker'})
+
+    # Upcoming exchange holidays and early closes, raising on failure
+    def fetch_upcoming_market_holidays(self):
+        response = http_client.get(f"{self.base_url}/v1/marketstatus/upcoming?apiKey={self.api_key}")
+        if response.status_code != 200:
+            raise PolygonAPIError(response.status_code, response.text)
+        return response.json()
+
+    # Raw financials filings, raising on failure. date_filters such as gte='2023-01-01' bound the filing date.
+    def get_financials(self, ticker, limit, timeframe=None, **date_filters):
+        url = f"{self.base_url}/vX/reference/financials?ticker={ticker}&limit={limit}&apiKey={self.api_key}"
+        if timeframe:
+            url += f"&timeframe={timeframe}"
+        for key, value in date_filters.items():
+            if value:  # Only add the filter if the value is not None
+                url += f"&filing_date.{key}={value}"
+        logger.info(f"Requesting financials data for {ticker} with limit {limit} and timeframe {timeframe}")
+        response = http_client.get(url)
+        if response.status_code != 200:
+            raise PolygonAPIError(response.status_code, response.text)
+        data = response.json().get('results', [])
+        logger.info(f"Successfully retrieved financials data for {ticker}. Number of records: {len(data)}")
+        return data
+
+    # Financials filings flattened into one row per filing
+    def get_financials_dataframe(self, ticker, limit, timeframe=None, **date_filters):
+        return create_financials_dataframe(self.get_financials(ticker, limit, timeframe, **date_filters))
+
+    # Company details as a one-column frame of fields, raising on failure
+    def get_company_details(self, ticker):
+        logger.info(f"Requesting company details for ticker: {ticker}")
+        url = f"{self.base_url}/v3/reference/tickers/{ticker}?apiKey={self.api_key}"
+        response = http_client.get(url)
+        if response.status_code != 200:
+            logger.error(f"Failed to retrieve company details for {ticker}: HTTP {response.status_code}")
+            raise PolygonAPIError(response.status_code, response.text)
+        data = response.json().get('results', {})
+        if data:
+            logger.info(f"Successfully retrieved company details for {ticker}.")
+        else:
+            logger.warning(f"Company details for {ticker} were found, but no data was returned.")
+        # Convert the data to a dataframe
+        return pd.DataFrame([data]).transpose()
+
+    # Raw stock splits, following pagination; limit=None fetches every split
+    def get_splits(self, ticker=None, limit=50, **date_filters):
+        # limit is the total number of rows; pages are capped at the API maximum
+        page_size = min(limit, REFERENCE_PAGE_LIMIT) if limit else REFERENCE_PAGE_LIMIT
+        url = f"{self.base_url}/v3/reference/splits?limit={page_size}&apiKey={self.api_key}"
+        if ticker:
+            url += f"&ticker={ticker}"
+        for key, value in date_filters.items():
+            if value:  # Only add the filter if the value is not None
+                url += f"&execution_date.{key}={value}"
+        return [split for page in iter_pages(url, self.api_key, max_results=limit) for split in page]
+
+    # Stock splits with their adjustment factor, for display
+    def get_stock_splits(self, ticker=None, limit=50, **date_filters):
+        logger.info(f"Requesting stock splits data for ticker: {ticker if ticker else 'All Tickers'} with limit: {limit}")
+        try:
+            data = self.get_splits(ticker, limit, **date_filters)
+        except PolygonAPIError as e:
+            logger.error(f"Failed to retrieve stock splits data for {ticker if ticker else 'All Tickers'}: HTTP {e.status_code}")
+            raise
+        if data:
+            logger.info(f"Successfully retrieved stock splits data for {ticker if ticker else 'All Tickers'}.")
+            df = pd.DataFrame(data)[['ticker', 'execution_date', 'split_from', 'split_to']]
+            df.columns = ['Ticker', 'Execution Date', 'Split From', 'Split To']
+            df['Adjustment Factor'] = df['Split From'] / df['Split To']
+            df['Adjustment Factor'] = df['Adjustment Factor'].apply(lambda x: f"{x:.10f}")
+            return df
+        else:
+            logger.warning(f"Stock splits data for {ticker if ticker else 'All Tickers'} was found, but no data was returned.")
+            return pd.DataFrame(columns=['Ticker', 'Execution Date', 'Split From', 'Split To', 'Adjustment Factor'])
+
+    # Every split of a ticker, for adjusting its bars locally
+    def get_split_history(self, ticker):
+        logger.info(f"Requesting split history for {ticker}")
+        return pd.DataFrame(self.get_splits(ticker, None), columns=['execution_date', 'split_from', 'split_to'])
+
+    # Raw dividends of a ticker, following pagination
+    def get_dividends(self, ticker, limit):
+        logger.info(f"Requesting dividends data for ticker: {ticker} with limit: {limit}")
+        page_size = min(limit, REFERENCE_PAGE_LIMIT) if limit else REFERENCE_PAGE_LIMIT
+        url = f"{self.base_url}/v3/reference/dividends?ticker={ticker}&limit={page_size}&apiKey={self.api_key}"
+        try:
+            data = [dividend for page in iter_pages(url, self.api_key, max_results=limit) for dividend in page]
+        except PolygonAPIError as e:
+            logger.error(f"Failed to retrieve dividends data for {ticker}: HTTP {e.status_code}")
+            raise
+        if data:
+            logger.info(f"Successfully retrieved dividends data for {ticker}.")
+        else:
+            logger.warning(f"Dividends data for {ticker} was found, but no data was returned.")
+        return data
+
+    # Latest news, for one ticker or the whole market
+    def get_news(self, ticker=None, limit=5):
+        page_size = min(limit, REFERENCE_PAGE_LIMIT) if limit else REFERENCE_PAGE_LIMIT
+        url = f"{self.base_url}/v2/reference/news?limit={page_size}&apiKey={self.api_key}"
+        if ticker:
+            url += f"&ticker={ticker}"
+        return [news for page in iter_pages(url, self.api_key, max_results=limit) for news in page]
+
+# Create a dataframe from the financials data
+def create_financials_dataframe(data):
+    logger.info(f"Starting to create dataframe from financials data. Number of records: {len(data)}")
+    df = flatten_financials(data)
+
+    if df.empty:
+        logger.warning("No records were created for the dataframe.")
+    else:
+        logger.info("Successfully created records for dataframe.")
+
+    logger.info(f"Dataframe creation completed. Number of rows: {df.shape[0]}")
+    return df
@@ -0,0 +1,59 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from market_calendar import get_calendar
+from config.api_config import AGGS_MAX_ROWS, CHUNK_WORKERS
+
+# Initialize the logger (configured by the application, if at all)
+logger = logging.getLogger(f'polygon.{__name__}')
+
+# Upper bound of bars per calendar day, counting pre-market and after-hours (04:00-20:00 ET)
+MAX_BARS_PER_DAY = {'second': 57600, 'minute': 960, 'hour': 16}
+
+# Calendar-aligned window sizes from largest to smallest, as the periods that group trading days into windows
+WINDOW_PERIODS = ['Y', 'Q', 'M', 'W-SUN', 'D']  # 'W-SUN' weeks run Monday to Sunday
+
+# Split a date range into calendar-aligned windows that each stay under the row cap. Windows start and end on
+# trading days, so weekends and holidays at their edges are never requested and a closed-only range needs no request.
+def plan_windows(from_date, to_date, timespan, max_rows=AGGS_MAX_ROWS):
+    calendar = get_calendar()
+    bars_per_day = MAX_BARS_PER_DAY.get(timespan)
+
+    # Daily and coarser bars never reach the cap in one request. Bars coarser than a day are dated by their
+    # period start, which need not be a trading day, so their range is kept as asked.
+    if bars_per_day is None:
+        if not calendar.has_trading_days(from_date, to_date):
+            return []
+        return [(pd.Timestamp(from_date).strftime('%Y-%m-%d'), pd.Timestamp(to_date).strftime('%Y-%m-%d'))]
+
+    days = calendar.trading_days(from_date, to_date)
+    if days.empty:
+        return []
+
+    # Use the largest calendar unit whose busiest window still fits under the cap
+    for period in WINDOW_PERIODS:
+        windows = pd.Series(days, index=days.to_period(period)).groupby(level=0, sort=True).agg(['first', 'last', 'size'])
+        if windows['size'].max() * bars_per_day <= max_rows:
+            break
+    windows = windows.drop(columns='size')
+    return [(first.strftime('%Y-%m-%d'), last.strftime('%Y-%m-%d')) for first, last in windows.itertuples(index=False, name=None)]
+
+# Fetch every window concurrently and stitch the bars back together in time order
+def fetch_windows(windows, fetch_window, workers=CHUNK_WORKERS):
+    if not windows:
+        return pd.DataFrame()
+    if len(windows) == 1:
+        frames = [fetch_window(*windows[0])]
+    else:
+        logger.info(f"Fetching {len(windows)} date windows with {workers} worker(s)")
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(windows))), thread_name_prefix='polygon-window') as executor:
+            frames = list(executor.map(lambda window: fetch_window(*window), windows))
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    # Drop any bar that was returned by more than one window
+    bars = pd.concat(frames, ignore_index=True)
+    bars = bars.drop_duplicates(subset='t', keep='last').sort_values('t', kind='stable')
+    return bars.reset_index(drop=True)
@@ -0,0 +1,92 @@
+import collections
+import logging
+import threading
+import time
+from config.api_config import PLAN_RATE_LIMITS, POLYGON_PLAN
+
+# Initialize the logger (configured by the application, if at all)
+logger = logging.getLogger(f'polygon.{__name__}')
+
+# Token bucket that makes callers wait their turn, in arrival order, instead of failing them
+class TokenBucket:
+    def __init__(self, requests_per_minute, burst=None):
+        self.requests_per_minute = requests_per_minute
+        self.rate = requests_per_minute / 60.0  # Tokens added per second
+        # By default allow a full minute's quota in one burst on small plans, and one second's worth on large ones
+        self.capacity = burst if burst is not None else max(1, requests_per_minute if requests_per_minute <= 60 else requests_per_minute // 60)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+        self._waiters = collections.deque()  # Tickets of queued callers, first in first out
+        self._acquired = 0
+        self._total_wait = 0.0
+        self._last_wait = 0.0
+        self._max_wait = 0.0
+
+    # Add the tokens earned since the last update, up to the bucket capacity
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    # Block until a token is available for this caller and all callers queued before it
+    def acquire(self):
+        ticket = object()
+        start = time.monotonic()
+        with self._condition:
+            self._waiters.append(ticket)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] is ticket:
+                        if self._tokens >= 1:
+                            self._tokens -= 1
+                            break
+                        # Only the head of the queue waits on the clock; the rest wait for their turn
+                        self._condition.wait((1 - self._tokens) / self.rate)
+                    else:
+                        self._condition.wait()
+            finally:
+                self._waiters.remove(ticket)
+                self._condition.notify_all()
+
+            waited = time.monotonic() - start
+            self._acquired += 1
+            self._total_wait += waited
+            self._last_wait = waited
+            self._max_wait = max(self._max_wait, waited)
+        if waited >= 1:
+            logger.info(f"Rate limiter delayed a request by {waited:.2f}s ({self.requests_per_minute} requests/minute)")
+        return waited
+
+    # Current queue depth and wait times in seconds
+    def stats(self):
+        with self._condition:
+            self._refill()
+            queue_depth = len(self._waiters)
+            return {
+                'requests_per_minute': self.requests_per_minute,
+                'queue_depth': queue_depth,
+                'tokens_available': self._tokens,
+                'estimated_wait': max(0.0, (queue_depth + 1 - self._tokens) / self.rate),  # Wait for a caller arriving now
+                'last_wait': self._last_wait,
+                'average_wait': self._total_wait / self._acquired if self._acquired else 0.0,
+                'max_wait': self._max_wait,
+                'acquired': self._acquired,
+            }
+
+# Process-wide limiter shared by every session using the same API_KEY
+_limiter = None
+_limiter_lock = threading.Lock()
+
+# Get the shared limiter for the configured plan tier
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                if POLYGON_PLAN not in PLAN_RATE_LIMITS:
+                    raise ValueError(f"Unknown POLYGON_PLAN '{POLYGON_PLAN}'. Expected one of: {', '.join(PLAN_RATE_LIMITS)}")
+                _limiter = TokenBucket(PLAN_RATE_LIMITS[POLYGON_PLAN])
+                logger.info(f"Created rate limiter for plan '{POLYGON_PLAN}' ({PLAN_RATE_LIMITS[POLYGON_PLAN]} requests/minute)")
+    return _limiter
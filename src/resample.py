@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from market_calendar import get_calendar
+from ohlcv import OHLCVBars
+from config.cache_config import MARKET_TIMEZONE
+
+# Timespans that can be derived from minute bars
+RESAMPLE_TIMESPANS = ('hour', 'day', 'week', 'month', 'quarter', 'year')
+
+# Trading sessions as [start, end) minutes after midnight in the market timezone
+SESSIONS = {
+    'extended': (4 * 60, 20 * 60),  # 04:00-20:00, the hours covered by Polygon aggregates
+    'regular': (9 * 60 + 30, 16 * 60),  # 09:30-16:00
+}
+
+# Epoch milliseconds at which the bucket containing each bar starts
+def bucket_starts(t, timespan):
+    t = np.asarray(t, dtype='int64')
+    # Market time offsets are whole hours, so hours can be floored in UTC without a timezone lookup
+    if timespan == 'hour':
+        return t // 3_600_000 * 3_600_000
+
+    local = pd.to_datetime(t, unit='ms', utc=True).tz_convert(MARKET_TIMEZONE).tz_localize(None)
+    if timespan == 'day':
+        starts = local.normalize()
+    elif timespan == 'week':
+        # Weeks start on Sunday, as Polygon's weekly aggregates do
+        starts = local.normalize() - pd.to_timedelta((local.dayofweek + 1) % 7, unit='D')
+    elif timespan in ('month', 'quarter', 'year'):
+        starts = local.to_period({'month': 'M', 'quarter': 'Q', 'year': 'Y'}[timespan]).to_timestamp()
+    else:
+        raise ValueError(f"Cannot derive '{timespan}' bars. Expected one of: {', '.join(RESAMPLE_TIMESPANS)}")
+    # Day and longer buckets start at midnight, which is never ambiguous in the market timezone
+    return starts.tz_localize(MARKET_TIMEZONE).asi8 // 1_000_000
+
+# Which bars (epoch milliseconds) fall on a trading day inside the trading session; session=None keeps every hour
+def session_mask(t, session):
+    local = pd.to_datetime(t, unit='ms', utc=True).tz_convert(MARKET_TIMEZONE)
+    keep = get_calendar().is_trading_day(local)
+    if session is not None:
+        session_start, session_end = SESSIONS[session]
+        minutes = local.hour * 60 + local.minute
+        keep &= (minutes >= session_start) & (minutes < session_end)
+    return keep
+
+# Aggregate raw minute bars (t, o, h, l, c, v, vw, n) into coarser bars of the same shape.
+# OHLCVBars are aggregated on their arrays and come back as OHLCVBars.
+def resample_bars(bars, timespan, session='extended'):
+    if bars.empty:
+        return bars
+    if isinstance(bars, OHLCVBars):
+        return resample_ohlcv(bars, timespan, session)
+    bars = bars.sort_values('t', kind='stable')
+
+    # Keep only the bars of trading days inside the trading session
+    bars = bars[session_mask(bars['t'].to_numpy(), session)]
+    if bars.empty:
+        return bars
+
+    key = bucket_starts(bars['t'].to_numpy(), timespan)
+    volume = bars['v'].to_numpy(dtype='float64')
+    vw = bars['vw'].to_numpy(dtype='float64') if 'vw' in bars else bars['c'].to_numpy(dtype='float64')
+    grouped = bars.assign(t=key, pv=vw * volume).groupby('t', sort=True)
+    resampled = grouped.agg(o=('o', 'first'), h=('h', 'max'), l=('l', 'min'), c=('c', 'last'), v=('v', 'sum'), pv=('pv', 'sum'))
+    # Volume-weighted price of the bucket, from the volume-weighted prices of its bars
+    resampled['vw'] = resampled['pv'] / resampled['v'].where(resampled['v'] > 0)
+    if 'n' in bars:
+        resampled['n'] = grouped['n'].sum()
+    return resampled.drop(columns='pv').reset_index()
+
+# Aggregate OHLCVBars with one reduction per field over the runs of bars sharing a bucket, without a groupby
+def resample_ohlcv(bars, timespan, session='extended'):
+    if (np.diff(bars.t) < 0).any():
+        bars = bars[np.argsort(bars.t, kind='stable')]
+    bars = bars[session_mask(bars.t_ms(), session)]
+    if bars.empty:
+        return bars
+
+    key = bucket_starts(bars.t_ms(), timespan)
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    ends = np.r_[starts[1:], len(key)] - 1
+    volume = np.add.reduceat(bars.v, starts)
+    # Volume-weighted price of the bucket, from the volume-weighted prices of its bars (or closes where missing)
+    vw = np.where(np.isnan(bars.vw), bars.c, bars.vw).astype('float64')
+    pv = np.add.reduceat(vw * bars.v, starts)
+    return OHLCVBars(
+        key[starts] * 1_000_000, bars.o[starts], np.fmax.reduceat(bars.h, starts), np.fmin.reduceat(bars.l, starts), bars.c[ends],
+        volume, pv / np.where(volume > 0, volume, np.nan), np.add.reduceat(bars.n, starts), price_dtype=bars.price_dtype,
+    )
@@ -0,0 +1,90 @@
+import functools
+import sys
+import numpy as np
+import pandas as pd
+from ohlcv import OHLCVBars
+
+# DataFrame methods that can modify the frame in place through inplace=True
+INPLACE_METHODS = (
+    'clip', 'drop', 'drop_duplicates', 'dropna', 'eval', 'ffill', 'bfill', 'fillna', 'interpolate', 'mask',
+    'query', 'rename', 'rename_axis', 'replace', 'reset_index', 'set_index', 'sort_index', 'sort_values', 'where',
+)
+
+# Error raised when a caller tries to modify a frame shared between sessions
+def _read_only_error(action):
+    return TypeError(f"Cannot {action} a shared cached DataFrame; call .copy() first to get a private copy")
+
+# Reject inplace=True on a DataFrame method while leaving copying calls untouched
+def _guard_inplace(name):
+    method = getattr(pd.DataFrame, name)
+
+    @functools.wraps(method)
+    def guarded(self, *args, **kwargs):
+        if kwargs.get('inplace'):
+            raise _read_only_error(f"call {name}(inplace=True) on")
+        return method(self, *args, **kwargs)
+    return guarded
+
+# DataFrame shared by every session through the resource cache; its values, index, columns and
+# column set cannot be changed, while frames derived from it are ordinary DataFrames
+class ReadOnlyDataFrame(pd.DataFrame):
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def __setitem__(self, key, value):
+        raise _read_only_error('set columns of')
+
+    def __delitem__(self, key):
+        raise _read_only_error('delete columns of')
+
+    def __setattr__(self, name, value):
+        # pandas sets its private attributes while building the frame
+        if name.startswith('_'):
+            return object.__setattr__(self, name, value)
+        raise _read_only_error(f"set '{name}' on")
+
+    def insert(self, *args, **kwargs):
+        raise _read_only_error('insert columns into')
+
+    def pop(self, item):
+        raise _read_only_error('pop columns from')
+
+    def update(self, *args, **kwargs):
+        raise _read_only_error('update')
+
+    # pandas sizes object columns through a writable buffer, which the read-only arrays are not, so their
+    # objects are sized here the same way (array bytes plus sys.getsizeof of every object)
+    def memory_usage(self, index=True, deep=False):
+        usage = pd.DataFrame.memory_usage(self, index=index, deep=False)
+        if deep:
+            if index:
+                usage.iloc[0] = self.index.memory_usage(deep=True)
+            for position, (_, column) in enumerate(self.items()):
+                if column.dtype == object:
+                    usage.iloc[position + int(index)] += sum(map(sys.getsizeof, column.to_numpy()))
+        return usage
+
+for _name in INPLACE_METHODS:
+    setattr(ReadOnlyDataFrame, _name, _guard_inplace(_name))
+
+# Copy a frame once into read-only arrays, so writes through .loc, .iloc or .values raise instead of
+# changing the copy every session sees. Extension-typed columns are kept as they are. OHLCVBars are
+# frozen in place, since their arrays already belong to the cached value alone.
+def freeze_frame(df):
+    if isinstance(df, OHLCVBars):
+        return df.freeze()
+    if not isinstance(df, pd.DataFrame) or isinstance(df, ReadOnlyDataFrame):
+        return df
+    columns = {}
+    for position, (_, column) in enumerate(df.items()):
+        if isinstance(column.dtype, np.dtype):
+            values = column.to_numpy(copy=True)
+            values.flags.writeable = False
+            columns[position] = values
+        else:
+            columns[position] = column.array
+    frozen = ReadOnlyDataFrame(columns, index=df.index, copy=False)
+    # Columns are built by position so that duplicate names survive, then the real names are restored
+    pd.DataFrame.__setattr__(frozen, 'columns', df.columns)
+    return frozen
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from ohlcv import OHLCVBars
+from config.cache_config import MARKET_TIMEZONE
+
+# Price columns of a raw bar that are scaled by split adjustment
+PRICE_COLUMNS = ['o', 'h', 'l', 'c', 'vw']
+
+# Cumulative adjustment factor of each bar: the product of split_from / split_to over every split executed after it
+def adjustment_factors(t, splits):
+    t = np.asarray(t, dtype='int64')
+    if splits is None or splits.empty:
+        return np.ones(len(t))
+
+    # Announced splits that have not executed yet must not scale any bar; today's split already applies at the open
+    today = pd.Timestamp.now(tz=MARKET_TIMEZONE).strftime('%Y-%m-%d')
+    splits = splits[pd.to_datetime(splits['execution_date']) <= today].sort_values('execution_date')
+    if splits.empty:
+        return np.ones(len(t))
+
+    # A split takes effect at the open of its execution date, so bars from that midnight on are already post-split
+    executed = pd.DatetimeIndex(pd.to_datetime(splits['execution_date'])).tz_localize(MARKET_TIMEZONE).asi8 // 1_000_000
+    ratios = splits['split_from'].to_numpy(dtype='float64') / splits['split_to'].to_numpy(dtype='float64')
+
+    # suffix[i] is the combined ratio of splits i and later; bars after the last split keep a factor of 1
+    suffix = np.append(np.cumprod(ratios[::-1])[::-1], 1.0)
+    return suffix[np.searchsorted(executed, t, side='right')]
+
+# Split-adjust raw bars (t, o, h, l, c, v, vw, n) or OHLCVBars: prices are multiplied and volume divided by the factor
+def adjust_for_splits(bars, splits):
+    if bars.empty or splits is None or splits.empty:
+        return bars
+    if isinstance(bars, OHLCVBars):
+        factors = adjustment_factors(bars.t_ms(), splits)
+        return bars.replace(**{column: getattr(bars, column) * factors for column in PRICE_COLUMNS}, v=bars.v / factors)
+    factors = adjustment_factors(bars['t'].to_numpy(), splits)
+    adjusted = bars.copy()
+    for column in PRICE_COLUMNS:
+        if column in adjusted:
+            adjusted[column] = adjusted[column].to_numpy(dtype='float64') * factors
+    adjusted['v'] = adjusted['v'].to_numpy(dtype='float64') / factors
+    return adjusted
+
+# Split-adjust an Open/High/Low/Close/Volume frame on a timezone-aware 'Date' index, such as cached unadjusted bars
+def adjust_ohlcv_frame(df, splits):
+    if df.empty or splits is None or splits.empty:
+        return df
+    factors = adjustment_factors(df.index.asi8 // 1_000_000, splits)
+    adjusted = df.copy()
+    for column in ['Open', 'High', 'Low', 'Close']:
+        adjusted[column] = adjusted[column].to_numpy(dtype='float64') * factors
+    adjusted['Volume'] = adjusted['Volume'].to_numpy(dtype='float64') / factors
+    return adjusted